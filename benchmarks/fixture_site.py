@@ -0,0 +1,181 @@
+import threading
+import time
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# Synthetic property page sizes: element counts per page
+PAGE_SIZES = {
+    'small': {'images': 10, 'links': 20, 'headings': 6, 'currencies': 3, 'tiles': 4},
+    'medium': {'images': 60, 'links': 150, 'headings': 20, 'currencies': 10, 'tiles': 12},
+    'large': {'images': 300, 'links': 800, 'headings': 60, 'currencies': 25, 'tiles': 40},
+}
+
+# Status codes the link farm serves, cycled through by link index
+LINK_FARM_STATUSES = [200] * 16 + [404, 404, 500, 301]
+
+CURRENCIES = [
+    ('USD', '$'), ('EUR', '€'), ('GBP', '£'), ('JPY', '¥'), ('INR', '₹'),
+    ('BDT', '৳'), ('KRW', '₩'), ('TRY', '₺'), ('RUB', '₽'), ('ILS', '₪'),
+    ('NGN', '₦'), ('PHP', '₱'), ('VND', '₫'), ('UAH', '₴'), ('KZT', '₸'),
+    ('CRC', '₡'), ('PYG', '₲'), ('GHS', '₵'), ('LAK', '₭'), ('MNT', '₮'),
+    ('AZN', '₼'), ('GEL', '₾'), ('THB', '฿'), ('CHF', 'CHF'), ('BRL', 'R$'),
+]
+
+CURRENCY_JS = """
+var footer = document.getElementById('js-currency-sort-footer');
+var list = footer.querySelector('.select-ul');
+footer.addEventListener('click', function (event) {
+    var option = event.target.closest('li');
+    if (!option) {
+        list.style.display = list.style.display === 'none' ? 'block' : 'none';
+        return;
+    }
+    var symbol = option.querySelector('p').textContent;
+    list.style.display = 'none';
+    // Re-render prices asynchronously, like the real site does after a request
+    setTimeout(function () {
+        document.querySelectorAll('.js-price-value').forEach(function (tile, i) {
+            tile.textContent = symbol + ' ' + (100 + i);
+        });
+    }, 30);
+});
+"""
+
+
+def render_property_page(size, base_url):
+    """
+    Render a synthetic property page.
+
+    :param size: Key of PAGE_SIZES
+    :param base_url: Base URL of the fixture site, used for link farm links
+    :return: HTML string
+    """
+    counts = PAGE_SIZES[size]
+    parts = ['<!DOCTYPE html><html><head><title>Fixture property</title>',
+             '<script>var ScriptData = {"config":{"SiteUrl":"' + base_url + '","SiteName":"Fixture"},'
+             '"userInfo":{"Browser":"Chrome","CountryCode":"ES","IP":"127.0.0.1"}};</script>',
+             '</head><body>']
+
+    for i in range(counts['headings']):
+        level = i % 6 + 1
+        parts.append(f'<h{level}>Heading {i}</h{level}>')
+    for i in range(counts['images']):
+        alt = '' if i % 7 == 0 else f' alt="Photo {i}"'
+        parts.append(f'<img src="/static/photo-{i}.jpg"{alt}>')
+    for i in range(counts['links']):
+        status = LINK_FARM_STATUSES[i % len(LINK_FARM_STATUSES)]
+        parts.append(f'<a href="{base_url}/farm/{status}?n={i}">Link {i}</a>')
+    for i in range(counts['tiles']):
+        parts.append(f'<div class="tile"><span class="js-price-value">$ {100 + i}</span></div>')
+
+    parts.append('<div id="js-currency-sort-footer"><p>Currency</p><ul class="select-ul" style="display:none">')
+    for code, symbol in CURRENCIES[:counts['currencies']]:
+        parts.append(f'<li data-currency-country="{code}"><p>{escape(symbol)}</p></li>')
+    parts.append('</ul></div>')
+
+    parts.append('<script>ScriptData.pageData = {CampaignId: "FIXTURE-1", PageType: "property"};</script>')
+    parts.append(f'<script>{CURRENCY_JS}</script></body></html>')
+    return ''.join(parts)
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        parts = urlsplit(self.path)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        query = parse_qs(parts.query)
+
+        if len(segments) == 2 and segments[0] == 'property' and segments[1] in PAGE_SIZES:
+            body = render_property_page(segments[1], self.server.base_url).encode('utf-8')
+            self._send(200, body, 'text/html; charset=utf-8', send_body)
+        elif len(segments) == 2 and segments[0] == 'farm' and segments[1].isdigit():
+            delay = int(query.get('delay', [self.server.link_latency_ms])[0])
+            if delay:
+                time.sleep(delay / 1000)
+            status = int(segments[1])
+            if status in (301, 302):
+                self.send_response(status)
+                self.send_header('Location', '/farm/200')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self._send(status, b'farm', 'text/plain', send_body)
+        elif segments and segments[0] == 'static':
+            self._send(200, b'', 'image/jpeg', send_body)
+        else:
+            self._send(404, b'not found', 'text/plain', send_body)
+
+    def _send(self, status, body, content_type, send_body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite:
+    """
+    Local HTTP server with synthetic property pages and a link farm that
+    answers with mixed status codes after a configurable latency.
+
+        /property/<small|medium|large>   property page
+        /farm/<status>?delay=<ms>        link farm response
+    """
+
+    def __init__(self, link_latency_ms=0, host='127.0.0.1', port=0):
+        """
+        :param link_latency_ms: Default delay of link farm responses
+        :param host: Interface to bind
+        :param port: Port to bind; 0 picks a free port
+        """
+        self._server = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self._server.daemon_threads = True
+        self._server.link_latency_ms = link_latency_ms
+        self.base_url = f"http://{host}:{self._server.server_port}"
+        self._server.base_url = self.base_url
+        self._thread = None
+
+    def page_url(self, size, page=None):
+        """
+        URL of a property page; distinct page numbers give distinct URLs for the same content.
+        """
+        url = f"{self.base_url}/property/{size}"
+        return url if page is None else f"{url}?page={page}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with FixtureSite() as site:
+        print(f"Serving fixture site at {site.base_url} (Ctrl+C to stop)")
+        for size in PAGE_SIZES:
+            print(f"  {site.page_url(size)}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,206 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from config.config import Config
+from benchmarks.fixture_site import FixtureSite, PAGE_SIZES
+from utils.result_sinks import iter_jsonl_results
+from tests.registry import TESTS, BROWSER
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+REGRESSION_THRESHOLD = 0.10  # Flag a drop in pages/minute larger than this fraction
+
+
+def _version_label():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _configure(engine, work_dir):
+    # Keep benchmark runs isolated and repeatable: no link cache, no carried-forward
+    # results, no profiling or memory sampling, no run history, reports in a temp dir
+    Config.ENGINE = engine
+    Config.LINK_CACHE_ENABLED = False
+    Config.INCREMENTAL_ENABLED = False
+    Config.PROFILE_ENABLED = False
+    Config.MEMORY_MONITOR_ENABLED = False
+    Config.HISTORY_ENABLED = False
+    Config.REPORT_DIRECTORY = work_dir
+    # The JSON Lines stream is kept to check that every page was reported
+    Config.OUTPUT_FORMATS = ['xlsx', 'jsonl']
+    Config.URLS_FILE = None
+    Config.SITEMAP_URL = None
+    Config.CRAWL_DEPTH = 0
+
+
+def _load_snapshot(driver, url):
+    from utils.page_snapshot import capture_snapshot
+    from utils.static_page import fetch_static_snapshot
+    if Config.ENGINE == 'static':
+        return fetch_static_snapshot(url)
+    return capture_snapshot(driver, url)
+
+
+def benchmark_runners(site, size, driver, repeat):
+    """
+    Time each registered test on one page of the given size.
+
+    :return: Dictionary mapping test name to the best time in seconds over repeat runs
+    """
+    url = site.page_url(size)
+    Config.TEST_SITE_URL = url
+    timings = {'load_snapshot': min(_timed(_load_snapshot, driver, url) for _ in range(repeat))}
+    snapshot = _load_snapshot(driver, url)
+
+    for name, spec in TESTS.items():
+        if spec.needs == BROWSER and driver is None:
+            continue
+        timings[name] = min(_timed(spec.run, driver, url, snapshot) for _ in range(repeat))
+    return timings
+
+
+def benchmark_pipeline(site, size, pages, work_dir):
+    """
+    Time the full main() pipeline over distinct pages of the given size.
+
+    :return: Pages per minute
+    :raises RuntimeError: If the pipeline did not report every page; a broken run is not timed
+    """
+    import main
+
+    urls = [site.page_url(size, page) for page in range(pages)]
+    urls_file = os.path.join(work_dir, f'urls_{size}.txt')
+    with open(urls_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(urls))
+    Config.URLS_FILE = urls_file
+    try:
+        elapsed = _timed(main.main, None, True)
+    finally:
+        Config.URLS_FILE = None
+
+    stream_path = os.path.join(work_dir, f"{os.path.splitext(Config.REPORT_FILENAME)[0]}.jsonl")
+    reported = {row.get('page_url') for _, row in iter_jsonl_results(stream_path)} if os.path.exists(stream_path) else set()
+    missing = [url for url in urls if url not in reported]
+    if missing:
+        raise RuntimeError(f"Pipeline reported no results for {len(missing)} of {len(urls)} page(s), e.g. {missing[0]}")
+    return pages / elapsed * 60
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def _previous_results(engine, label):
+    # Most recent stored run of the same engine from another version
+    candidates = []
+    for path in glob.glob(os.path.join(RESULTS_DIR, '*.json')):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('engine') == engine and data.get('version') != label:
+            candidates.append(data)
+    return max(candidates, key=lambda data: data['timestamp'], default=None)
+
+
+def compare(current, previous):
+    """
+    Print pages/minute per size against a previous run and flag regressions.
+
+    :return: True if any size regressed by more than REGRESSION_THRESHOLD
+    """
+    regressed = False
+    print(f"\nCompared with {previous['version']} ({previous['timestamp']}):")
+    for size, result in current['sizes'].items():
+        before = previous['sizes'].get(size, {}).get('pages_per_minute')
+        after = result['pages_per_minute']
+        if not before:
+            continue
+        change = (after - before) / before
+        flag = ''
+        if change < -REGRESSION_THRESHOLD:
+            flag = '  <-- REGRESSION'
+            regressed = True
+        print(f"  {size:<8}{before:>10.1f} -> {after:>10.1f} pages/min ({change:+.1%}){flag}")
+    return regressed
+
+
+def run_benchmarks(engine='static', sizes=None, pages=20, repeat=3, link_latency_ms=20, workers=1):
+    """
+    Run the benchmark suite against a local fixture site and store the results.
+
+    :param engine: 'static' or 'browser'; browser tests only run with 'browser'
+    :param sizes: Page sizes to run, keys of PAGE_SIZES
+    :param pages: Pages per size in the pipeline benchmark
+    :param repeat: Runs per runner benchmark; the best time is kept
+    :param link_latency_ms: Latency of link farm responses
+    :param workers: Worker processes for the pipeline benchmark
+    :return: Dictionary of results, as stored in benchmarks/results
+    """
+    sizes = sizes or list(PAGE_SIZES)
+    label = _version_label()
+    results = {
+        'version': label,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'engine': engine,
+        'pages': pages,
+        'workers': workers,
+        'link_latency_ms': link_latency_ms,
+        'sizes': {},
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir, FixtureSite(link_latency_ms) as site:
+        _configure(engine, work_dir)
+        Config.WORKERS = workers
+        Config.TESTS_TO_RUN = [name for name, spec in TESTS.items() if engine == 'browser' or spec.needs != BROWSER]
+
+        driver = None
+        if engine == 'browser':
+            from drivers.chrome_driver import get_chrome_driver
+            driver = get_chrome_driver()
+        try:
+            for size in sizes:
+                print(f"Benchmarking {size} pages...")
+                runners = benchmark_runners(site, size, driver, repeat)
+                pages_per_minute = benchmark_pipeline(site, size, pages, work_dir)
+                results['sizes'][size] = {'runners_s': runners, 'pages_per_minute': pages_per_minute}
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    print(f"\n{'Size':<8}{'Pages/min':>12}  Runner times (s)")
+    for size, result in results['sizes'].items():
+        runner_times = ', '.join(f"{name}={seconds:.3f}" for name, seconds in result['runners_s'].items())
+        print(f"{size:<8}{result['pages_per_minute']:>12.1f}  {runner_times}")
+
+    previous = _previous_results(engine, label)
+    if previous:
+        results['regressed'] = compare(results, previous)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}_{engine}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved: {path}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SEO checks against a local fixture site.")
+    parser.add_argument('--engine', choices=['static', 'browser'], default='static')
+    parser.add_argument('--sizes', default=','.join(PAGE_SIZES), help="Comma-separated page sizes")
+    parser.add_argument('--pages', type=int, default=20, help="Pages per size in the pipeline benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per runner benchmark")
+    parser.add_argument('--latency', type=int, default=20, help="Link farm latency in milliseconds")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for the pipeline benchmark")
+    args = parser.parse_args()
+
+    outcome = run_benchmarks(args.engine, args.sizes.split(','), args.pages, args.repeat, args.latency, args.workers)
+    raise SystemExit(1 if outcome.get('regressed') else 0)
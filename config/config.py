@@ -1,8 +1,21 @@
 # config/config.py
+import os
+
 class Config:
     TEST_SITE_URL = "https://www.alojamiento.io/property/chic-apartament-retiro-park-i-swimming-pool-elevenhost/BC-5455289"
     CHROME_DRIVER_PATH = None  # Will be set dynamically
     REPORT_DIRECTORY = "test_reports/"
+    REPORT_FILENAME = "test_report.xlsx"
+    PROFILE_ENABLED = True  # Time each phase and write a trace next to the report
+    TRACE_FILENAME = "trace.json"  # Chrome trace-event JSON, open in chrome://tracing or Perfetto
+    MEMORY_MONITOR_ENABLED = True  # Sample browser and Python memory after every page and write a timeline next to the report
+    MEMORY_TIMELINE_FILENAME = "memory_timeline.csv"
+    MEMORY_TRACEMALLOC = False  # Also trace Python allocations with tracemalloc; slows the run down
+    OUTPUT_FORMATS = ['xlsx']  # Any of 'xlsx', 'jsonl', 'csv', 'parquet' (needs pyarrow), 'sqlite'
+    SINK_BUFFER_ROWS = 1000  # Rows buffered per output before they are flushed to disk
+    HISTORY_ENABLED = True  # Record every run's results for comparing runs with `python main.py diff`
+    HISTORY_PATH = "test_reports/history.sqlite"
+    HISTORY_KEEP_RUNS = 100  # Older runs are deleted from the history; None keeps all
     
     # Test Parameters
     TESTS_TO_RUN = [
@@ -12,4 +25,92 @@ class Config:
         'url_status_test',
         'currency_filter_test',
         'script_data_test'
-    ]
\ No newline at end of file
+    ]
+    # Time budgets: page loads, waits and link checks take their timeout from the time left,
+    # and work past a budget is cancelled with a "Timed out" result
+    PAGE_DEADLINE = 120  # Seconds for all tests of one page
+    TEST_DEADLINES = {  # Seconds per test; tests not listed may use the rest of the page budget
+        'url_status_test': 60,
+        'currency_filter_test': 90,
+    }
+    PAGE_LOAD_TIMEOUT = 30  # Longest single page load in the browser
+    WAIT_TIMEOUT = 10  # Longest single wait for an element or condition
+
+    # Link status checking
+    LINK_CHECK_TIMEOUT = 10  # Seconds per request
+    LINK_CHECK_MAX_WORKERS = 32  # Concurrent checks across all hosts and pages of a process
+    LINK_CHECK_PER_HOST = 6  # Concurrent checks (and kept-alive connections) per host, across all pages of a process
+
+    # Persistent link status cache, shared across runs and pages
+    LINK_CACHE_ENABLED = True
+    LINK_CACHE_PATH = "test_reports/link_cache.sqlite"
+    LINK_CACHE_TTL = 24 * 60 * 60  # Seconds before a cached status is re-validated
+    LINK_CACHE_MAX_ENTRIES = 100000  # Least recently used entries are evicted above this
+    LINK_CACHE_KEEP_OPEN = False  # Share one open cache across checks; the check service turns this on
+
+    # Incremental runs: snapshot test results of pages whose SEO facts are unchanged are carried forward
+    INCREMENTAL_ENABLED = True
+    PAGE_STATE_PATH = "test_reports/page_state.sqlite"
+    PAGE_STATE_TTL = 7 * 24 * 60 * 60  # Seconds before an unchanged page is checked again anyway
+
+    # Page engine for the read-only tests:
+    # 'browser' renders the page in Chrome, 'static' fetches the HTML over HTTP without a browser,
+    # 'replay' reads the pages recorded in REPLAY_ARCHIVE without a browser or network access
+    ENGINE = 'browser'
+    PAGE_FETCH_TIMEOUT = 30  # Seconds per static page fetch
+    STATIC_USER_AGENT = "Mozilla/5.0 (Windows NT 11.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
+
+    # Record-and-replay page archives (zip of page snapshots)
+    RECORD_ARCHIVE = None  # Save every loaded page to this archive, e.g. "test_reports/pages.zip"
+    REPLAY_ARCHIVE = None  # Archive read by ENGINE = 'replay'; its pages are tested unless URLs are given
+
+    # Multi-page runs. Pages come from the first source that is set:
+    # URLS, URLS_FILE, SITEMAP_URL, a crawl from TEST_SITE_URL, or TEST_SITE_URL alone
+    URLS = []  # Page URLs, e.g. given with --url on the command line
+    URLS_FILE = None  # Text file with one URL per line
+    SITEMAP_URL = None  # sitemap.xml or sitemap index URL
+    CRAWL_DEPTH = 0  # Follow same-site links from TEST_SITE_URL up to this depth
+    MAX_PAGES = 1000
+    WORKERS = 1  # Worker processes, each owning its own WebDriver
+    NETWORK_TEST_WORKERS = 4  # Threads per process running network-bound tests such as url_status_test
+
+    # WebDriver sessions
+    HEADLESS = True  # Set to False to watch the browser
+    DRIVER_POOL_SIZE = 1  # Warm browser sessions kept per process
+    DRIVER_MAX_RETRIES = 1  # Times a page is retried on a fresh session after a browser crash
+    DRIVER_MAX_PAGES = 200  # Restart a browser session after this many pages; None for no limit
+    DRIVER_MAX_MEMORY_MB = 1500  # Restart a browser session whose process tree uses more memory; None for no limit
+    DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".wdm", "resolved_chromedriver_path")
+    DRIVER_PATH_MAX_AGE = 7 * 24 * 60 * 60  # Seconds before the driver binary is resolved online again
+
+    # Page-load profiles (see drivers/chrome_driver.py LOAD_PROFILES)
+    LOAD_PROFILE = 'lite'  # Profile browsers start with and read-only tests use
+    TEST_LOAD_PROFILES = {
+        'currency_filter_test': 'full',  # Interactive test loads every resource
+    }
+    BLOCKED_URL_PATTERNS = []  # Extra URL patterns blocked by the 'lite' profile, e.g. "*.example-cdn.com/*"
+
+    # Currency filter test
+    CURRENCY_WORKERS = 1  # Browser sessions per page checking currencies in parallel; above 1 starts extra browsers
+    CURRENCY_URL_TEMPLATE = None  # Switch currency by URL instead of the dropdown, e.g. "{url}?currency={code}"
+
+    # Subresource statuses read from Chrome's performance log, no extra requests
+    NETWORK_LOG_ENABLED = True
+    NETWORK_LOG_RESOURCE_TYPES = ['Image', 'Script', 'Stylesheet', 'Font', 'Media']  # CDP resource types to report
+
+    # ScriptData columns of script_data_test: column name -> key path in ScriptData
+    SCRIPT_DATA_FIELDS = {
+        'SiteURL': 'config.SiteUrl',
+        'CampaignID': 'pageData.CampaignId',
+        'SiteName': 'config.SiteName',
+        'Browser': 'userInfo.Browser',
+        'CountryCode': 'userInfo.CountryCode',
+        'IP': 'userInfo.IP',
+    }
+
+    # Check service (python main.py serve)
+    SERVICE_HOST = "127.0.0.1"
+    SERVICE_PORT = 8765
+    SERVICE_WORKERS = 4  # Pages checked at the same time across all jobs; also the number of warm browsers
+    SERVICE_MAX_QUEUED_JOBS = 32  # Jobs accepted at once; more are refused with 503
+    SERVICE_MAX_URLS_PER_JOB = 1000
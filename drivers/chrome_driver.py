@@ -1,23 +1,137 @@
+import os
+import time
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
+from config.config import Config
+from utils.network_log import enable_network_log
+from utils.profiler import PROFILER, instrument_driver
 
-def get_chrome_driver():
+# URL patterns for resource types, as Network.setBlockedURLs only matches URLs
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.wav', '*.m3u8'],
+}
+
+# Analytics and advertising hosts the checks never need
+TRACKER_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*facebook.net*',
+    '*connect.facebook.com*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+]
+
+# What the browser downloads while loading a page. The page load strategy is
+# fixed when the browser starts; blocked resources can change per test.
+LOAD_PROFILES = {
+    'full': {
+        'page_load_strategy': 'normal',
+        'block_resource_types': [],
+        'blocked_urls': [],
+    },
+    'lite': {
+        'page_load_strategy': 'eager',
+        'block_resource_types': ['image', 'font', 'media'],
+        'blocked_urls': TRACKER_PATTERNS,
+    },
+}
+
+def blocked_url_patterns(profile_name):
+    """
+    URL patterns blocked by a load profile.
+
+    :param profile_name: Key of LOAD_PROFILES
+    :return: List of URL patterns
+    """
+    profile = LOAD_PROFILES[profile_name]
+    patterns = list(profile['blocked_urls'])
+    for resource_type in profile['block_resource_types']:
+        patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    if patterns:
+        patterns.extend(Config.BLOCKED_URL_PATTERNS)
+    return patterns
+
+def apply_load_profile(driver, profile_name):
+    """
+    Switch the resources a running browser blocks, via CDP Network.setBlockedURLs.
+    Does nothing if the profile is already active.
+
+    :param driver: Selenium WebDriver started by get_chrome_driver
+    :param profile_name: Key of LOAD_PROFILES
+    """
+    if getattr(driver, 'load_profile', None) == profile_name:
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns(profile_name)})
+    driver.load_profile = profile_name
+
+def resolve_driver_path():
+    """
+    Resolve the ChromeDriver binary once per process and remember it on disk,
+    so later runs skip the online version lookup and also work offline.
+
+    :return: Path of the ChromeDriver binary
+    """
+    if Config.CHROME_DRIVER_PATH and os.path.exists(Config.CHROME_DRIVER_PATH):
+        return Config.CHROME_DRIVER_PATH
+
+    cached_path = None
+    if os.path.exists(Config.DRIVER_PATH_CACHE):
+        with open(Config.DRIVER_PATH_CACHE, encoding='utf-8') as f:
+            cached_path = f.read().strip()
+        cache_age = time.time() - os.path.getmtime(Config.DRIVER_PATH_CACHE)
+        if os.path.exists(cached_path) and cache_age < Config.DRIVER_PATH_MAX_AGE:
+            Config.CHROME_DRIVER_PATH = cached_path
+            return cached_path
+
+    try:
+        driver_path = ChromeDriverManager().install()
+    except Exception as e:
+        # Offline or lookup failed: an older binary is better than none
+        if cached_path and os.path.exists(cached_path):
+            print(f"Using cached ChromeDriver, lookup failed: {e}")
+            Config.CHROME_DRIVER_PATH = cached_path
+            return cached_path
+        raise
+
+    os.makedirs(os.path.dirname(Config.DRIVER_PATH_CACHE), exist_ok=True)
+    with open(Config.DRIVER_PATH_CACHE, 'w', encoding='utf-8') as f:
+        f.write(driver_path)
+    Config.CHROME_DRIVER_PATH = driver_path
+    return driver_path
+
+def get_chrome_driver(profile_name=None):
     """
     Setup and return Chrome WebDriver with standard options
+
+    :param profile_name: Key of LOAD_PROFILES; Config.LOAD_PROFILE if not given
     """
+    profile_name = profile_name or Config.LOAD_PROFILE
     chrome_options = Options()
+    chrome_options.page_load_strategy = LOAD_PROFILES[profile_name]['page_load_strategy']
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
-    #chrome_options.add_argument("--headless=new")  # New headless mode
-    #chrome_options.add_argument("--window-size=1920,1080")
-    #chrome_options.add_argument("--disable-gpu")
+    if Config.HEADLESS:
+        chrome_options.add_argument("--headless=new")  # New headless mode
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-gpu")
+    if Config.NETWORK_LOG_ENABLED:
+        # Subresource statuses are read from the log instead of requested again
+        enable_network_log(chrome_options)
     # if you use windows
     #chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 11.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36")
 
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    
+    with PROFILER.phase('driver_startup'):
+        service = Service(resolve_driver_path())
+        driver = instrument_driver(webdriver.Chrome(service=service, options=chrome_options))
+        driver.network_log_enabled = Config.NETWORK_LOG_ENABLED
+        apply_load_profile(driver, profile_name)
+
     return driver
@@ -0,0 +1,189 @@
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from config.config import Config
+from drivers.chrome_driver import get_chrome_driver
+from utils.memory_monitor import recycle_reason
+
+# Clears storage of the current origin; cookies are cleared separately
+CLEAR_STORAGE_JS = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class DriverPool:
+    """
+    Pool of warm WebDriver sessions. Sessions are reset between pages by
+    clearing cookies and storage instead of relaunching the browser, and a
+    crashed session is replaced without aborting the run. Sessions that served
+    Config.DRIVER_MAX_PAGES pages or grew past Config.DRIVER_MAX_MEMORY_MB are
+    quit between pages and replaced on the next acquire.
+    """
+
+    def __init__(self, size=None, factory=get_chrome_driver):
+        """
+        :param size: Maximum number of browser sessions; Config.DRIVER_POOL_SIZE if not given
+        :param factory: Callable that starts a new WebDriver
+        """
+        self.size = size or Config.DRIVER_POOL_SIZE
+        self.factory = factory
+        self._idle = []
+        # Guards the idle sessions and the slot count; notified whenever either changes
+        self._available = threading.Condition()
+        self._started = 0
+        self._closed = False
+
+    @property
+    def started(self):
+        """
+        Number of sessions running, idle or in use.
+        """
+        return self._started
+
+    def acquire(self):
+        """
+        Take an idle session, starting a new one while the pool is below its size.
+        Otherwise wait until a session is released or a discarded one frees its slot.
+
+        :return: Selenium WebDriver
+        """
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                self._available.wait()
+            if self._idle:
+                # Most recently used first, so idle sessions beyond the load stay cold
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return self.factory()
+        except Exception:
+            self._free_slot()
+            raise
+
+    def release(self, driver, reset=True):
+        """
+        Return a session to the pool, resetting its state. Dead sessions are discarded,
+        and sessions due for recycling are quit.
+
+        :param driver: Selenium WebDriver taken from this pool
+        :param reset: Clear cookies and storage before the next page; the session served a page
+        """
+        if self._closed or not is_alive(driver):
+            self.discard(driver)
+            return
+        if reset:
+            driver.session_pages = getattr(driver, 'session_pages', 0) + 1
+            reason = recycle_reason(driver)
+            if reason is not None:
+                print(f"Recycling browser session after {reason}...")
+                self.discard(driver)
+                return
+            try:
+                reset_session(driver)
+            except WebDriverException:
+                self.discard(driver)
+                return
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def discard(self, driver):
+        """
+        Quit a session and free its slot so a replacement can be started.
+        """
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._free_slot()
+
+    def _free_slot(self):
+        with self._available:
+            self._started -= 1
+            self._available.notify()
+
+    @contextmanager
+    def session(self):
+        """
+        Context manager that acquires a session and releases it afterwards.
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def run(self, fn, *args, retries=None):
+        """
+        Call fn(driver, *args) on a pooled session. If the browser died while
+        running, the session is replaced and the call is retried.
+
+        :param fn: Callable taking a WebDriver as first argument
+        :param retries: Times to retry on a fresh session; Config.DRIVER_MAX_RETRIES if not given
+        :return: Result of fn
+        """
+        retries = Config.DRIVER_MAX_RETRIES if retries is None else retries
+        for attempt in range(retries + 1):
+            driver = self.acquire()
+            retry = False
+            try:
+                result = fn(driver, *args)
+                # Tests catch their own errors, so a crash may only show up here
+                retry = attempt < retries and not is_alive(driver)
+            except WebDriverException:
+                retry = attempt < retries and not is_alive(driver)
+                if not retry:
+                    raise
+            finally:
+                # Any other error is raised as is, but the session always goes back
+                if retry:
+                    print("Browser session died, retrying on a new session...")
+                    self.discard(driver)
+                else:
+                    self.release(driver)
+            if not retry:
+                return result
+
+    def close(self):
+        """
+        Quit all idle sessions. Sessions still in use are quit when released.
+        """
+        self._closed = True
+        with self._available:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self.discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def is_alive(driver):
+    """
+    Whether the browser behind a WebDriver session still responds.
+    """
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def reset_session(driver):
+    """
+    Clear cookies and storage so the next page starts from a clean state.
+
+    :param driver: Selenium WebDriver
+    """
+    if urlsplit(driver.current_url).scheme in ('http', 'https'):
+        driver.execute_script(CLEAR_STORAGE_JS)
+    try:
+        # Clears cookies of every domain, not only the current one
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    except (AttributeError, WebDriverException):
+        driver.delete_all_cookies()
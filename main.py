@@ -1,42 +1,184 @@
 # main.py
-from drivers.chrome_driver import get_chrome_driver
+import argparse
+import os
+import sys
 from config.config import Config
-from tests.h1_tag_test import run_h1_tag_test
-from tests.url_status_test import run_url_status_test
-from tests.html_tag_sequence_test import run_html_tag_sequence_test
-from tests.currency_filter_test import run_currency_filter_test
-from tests.image_alt_test import run_image_alt_test
-from tests.script_data_test import run_scraping_and_save_report
-# Import other test modules as needed
-
-def main():
-    # Initialize Chrome WebDriver
-    driver = get_chrome_driver()
-    
+from utils.excel_reporter import ReportSession
+from utils.page_runner import run_pages
+from utils.sharding import parse_shard, select_shard, shard_filename, merge_shards
+from utils.run_history import diff_runs, list_runs
+from utils.url_sources import collect_urls, describe_source
+from tests.registry import TESTS, SNAPSHOT, get_tests
+from utils.profiler import PROFILER
+from utils.memory_monitor import MEMORY
+
+def main(shard=None, raise_errors=False):
+    """
+    Run the configured tests against the configured pages.
+
+    :param shard: Tuple (i, N) to test only shard i of N and write its own result store
+    :param raise_errors: Raise an error that stops the run instead of printing it, e.g. for benchmarks
+    """
     try:
-        # Run tests based on configuration
-        for test in Config.TESTS_TO_RUN:
-            if test == 'h1_tag_test':
-                run_h1_tag_test(driver)
-            elif test == 'url_status_test':
-                run_url_status_test(driver)
-            elif test == 'html_tag_sequence_test':
-                run_html_tag_sequence_test(driver)
-            elif test == 'currency_filter_test':
-                run_currency_filter_test(driver)
-            elif test == 'image_alt_test':
-                run_image_alt_test(driver)
-            else:
-                run_scraping_and_save_report(driver)
-
-            # Add other test conditions as needed
-    
+        if Config.PROFILE_ENABLED:
+            # Events go to the trace as they happen instead of piling up in memory
+            PROFILER.open_trace(os.path.join(Config.REPORT_DIRECTORY, Config.TRACE_FILENAME))
+        # Fail early on unknown test names instead of running the wrong test
+        specs = get_tests(Config.TESTS_TO_RUN)
+        if Config.ENGINE == 'replay':
+            skipped = [spec.name for spec in specs if spec.needs != SNAPSHOT]
+            if skipped:
+                print(f"Replaying {Config.REPLAY_ARCHIVE}; skipping tests that need a browser or network: {', '.join(skipped)}")
+
+        # Collect the pages to test from the configured source
+        urls = collect_urls()
+        if shard:
+            index, count = shard
+            urls = select_shard(urls, index, count)
+            print(f"Shard {index}/{count}: {len(urls)} page(s).")
+            report = ReportSession(shard_filename(index, count), formats=['sqlite'],
+                                   metadata={'shard': f"{index}/{count}"})
+        else:
+            # Shards are recorded in the run history once merged. Replays re-check old
+            # pages, so they stay out of it and never become the run a diff compares with
+            report = ReportSession(history=Config.ENGINE != 'replay',
+                                   history_label=f"{Config.ENGINE}: {describe_source()}")
+        print(f"Testing {len(urls)} page(s) with {max(1, min(Config.WORKERS, len(urls)))} worker(s)...")
+
+        # Run tests based on configuration; results of all pages go into
+        # one report that is written once at the end
+        with report:
+            for page_results in run_pages(urls, Config.TESTS_TO_RUN, Config.WORKERS):
+                for report_name, test_results in page_results.items():
+                    report.add(test_results, report_name)
+
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"An error occurred during testing: {e}")
-    
+
     finally:
-        # Close browser
-        driver.quit()
+        # Where the time went, printed and written next to the report
+        if Config.PROFILE_ENABLED:
+            PROFILER.print_summary()
+            PROFILER.write_trace(os.path.join(Config.REPORT_DIRECTORY, Config.TRACE_FILENAME))
+        # Memory of the browsers and of Python over the run
+        if Config.MEMORY_MONITOR_ENABLED:
+            MEMORY.print_summary()
+            MEMORY.write_timeline(os.path.join(Config.REPORT_DIRECTORY, Config.MEMORY_TIMELINE_FILENAME))
+
+COMMANDS = ('run', 'merge', 'list', 'serve', 'diff', 'runs')
+FORMATS = ('xlsx', 'jsonl', 'csv', 'parquet', 'sqlite')
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the SEO tests, or merge the result stores of sharded runs. "
+                    "Options override config/config.py; 'run' is the default command.")
+    commands = parser.add_subparsers(dest='command')
+
+    run = commands.add_parser('run', help="Test pages (default)")
+    run.add_argument('-t', '--test', dest='tests', nargs='+', metavar='TEST',
+                     help="Tests to run; see 'list'. Default: TESTS_TO_RUN")
+    run.add_argument('-u', '--url', dest='urls', nargs='+', metavar='URL', help="Pages to test")
+    run.add_argument('--urls-file', help="Text file with one URL per line")
+    run.add_argument('--sitemap', help="sitemap.xml or sitemap index URL")
+    run.add_argument('--crawl-depth', type=int, help="Follow same-site links from TEST_SITE_URL up to this depth")
+    run.add_argument('--engine', choices=['browser', 'static', 'replay'], help="How pages are loaded for the read-only tests")
+    run.add_argument('--record', metavar='ARCHIVE', help="Save every loaded page to this zip archive")
+    run.add_argument('--archive', help="Archive to test with --engine replay")
+    run.add_argument('--workers', type=int, help="Worker processes")
+    run.add_argument('--shard', help="Test only shard i of N, e.g. 2/8, into its own result store")
+    for command in (run, commands.add_parser('merge', help="Merge the result stores of sharded runs")):
+        command.add_argument('-f', '--format', dest='formats', nargs='+', choices=FORMATS,
+                             help="Output formats. Default: OUTPUT_FORMATS")
+        command.add_argument('-o', '--report-dir', help="Directory of the report. Default: REPORT_DIRECTORY")
+    commands.choices['merge'].add_argument('stores', nargs='+', help="SQLite stores written by sharded runs")
+    commands.add_parser('list', help="List the available tests")
+
+    serve = commands.add_parser('serve', help="Run the check service with warm browsers and a local job API")
+    serve.add_argument('--host', help="Address to listen on. Default: SERVICE_HOST")
+    serve.add_argument('--port', type=int, help="Port to listen on. Default: SERVICE_PORT")
+    serve.add_argument('--socket', help="Listen on this Unix socket instead of TCP")
+    serve.add_argument('--engine', choices=['browser', 'static'], help="How pages are loaded for the read-only tests")
+    serve.add_argument('--workers', dest='service_workers', type=int, help="Pages checked at the same time")
+    serve.add_argument('-t', '--test', dest='tests', nargs='+', metavar='TEST',
+                       help="Tests of jobs that name none; see 'list'. Default: TESTS_TO_RUN")
+
+    diff = commands.add_parser('diff', help="Show new, resolved and persistent failures between two recorded runs")
+    diff.add_argument('old', nargs='?', default='previous',
+                      help="Earlier run: a run id, 'latest', 'previous' or an age such as 1d. Default: previous")
+    diff.add_argument('new', nargs='?', default='latest', help="Later run, as above. Default: latest")
+    diff.add_argument('-r', '--report', help="Only compare this test or report sheet")
+    diff.add_argument('--csv', help="Write every new, resolved and persistent failure to this CSV file")
+    diff.add_argument('--limit', type=int, default=20, help="New and resolved failures printed. Default: 20")
+    runs = commands.add_parser('runs', help="List the recorded runs")
+    runs.add_argument('--limit', type=int, default=20, help="Runs listed. Default: 20")
+    for command in (run, commands.choices['merge'], diff, runs):
+        command.add_argument('--history', help="Run history file. Default: HISTORY_PATH")
+    return parser
+
+def apply_arguments(args):
+    """
+    Override Config with the options given on the command line.
+    """
+    overrides = {
+        'TESTS_TO_RUN': getattr(args, 'tests', None),
+        'URLS': getattr(args, 'urls', None),
+        'URLS_FILE': getattr(args, 'urls_file', None),
+        'SITEMAP_URL': getattr(args, 'sitemap', None),
+        'CRAWL_DEPTH': getattr(args, 'crawl_depth', None),
+        'ENGINE': getattr(args, 'engine', None),
+        'RECORD_ARCHIVE': getattr(args, 'record', None),
+        'REPLAY_ARCHIVE': getattr(args, 'archive', None),
+        'WORKERS': getattr(args, 'workers', None),
+        'SERVICE_WORKERS': getattr(args, 'service_workers', None),
+        'OUTPUT_FORMATS': getattr(args, 'formats', None),
+        'REPORT_DIRECTORY': getattr(args, 'report_dir', None),
+        'HISTORY_PATH': getattr(args, 'history', None),
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            setattr(Config, name, value)
+
+def cli(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv.insert(0, 'run')
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    apply_arguments(args)
+
+    if args.command == 'list':
+        for name, spec in TESTS.items():
+            print(f"{name:<26}{spec.needs}")
+    elif args.command == 'merge':
+        try:
+            merge_shards(args.stores)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == 'serve':
+        try:
+            get_tests(Config.TESTS_TO_RUN)
+        except ValueError as e:
+            parser.error(str(e))
+        from utils.check_service import serve
+        serve(args.host, args.port, args.socket)
+    elif args.command == 'diff':
+        try:
+            diff_runs(args.old, args.new, args.report, args.csv, args.limit)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == 'runs':
+        list_runs(args.limit)
+    else:
+        try:
+            get_tests(Config.TESTS_TO_RUN)
+            if Config.ENGINE == 'replay' and not Config.REPLAY_ARCHIVE:
+                raise ValueError("--engine replay needs --archive")
+            shard = parse_shard(args.shard) if args.shard else None
+        except ValueError as e:
+            parser.error(str(e))
+        main(shard)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
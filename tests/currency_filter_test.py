@@ -1,109 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.util import Finalize
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
 from config.config import Config
 from utils.excel_reporter import ExcelReporter
-from drivers.chrome_driver import get_chrome_driver
-import time
+from utils.web_utils import load_page, wait_for_all_text, wait_for_visible, wait_timeout
+from utils.deadline import DeadlineExceeded, current_deadline, deadline_scope, timed_out_result
+from utils.profiler import PROFILER
+from drivers.chrome_driver import get_chrome_driver, apply_load_profile
+from drivers.driver_pool import DriverPool
 
-def run_currency_filter_test(driver):
+REPORT_NAME = 'currency_filtering_test'
+
+CURRENCY_OPTION_SELECTOR = "#js-currency-sort-footer .select-ul li"
+PRICE_SELECTOR = ".js-price-value"
+
+READ_CURRENCY_OPTIONS_JS = """
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (li) {
+    var symbol = li.querySelector('p');
+    return {
+        code: li.getAttribute('data-currency-country'),
+        symbol: symbol ? symbol.innerText.trim() : ''
+    };
+});
+"""
+
+CLICK_CURRENCY_OPTION_JS = "document.querySelectorAll(arguments[0])[arguments[1]].click();"
+
+# Browser sessions of this process used besides the page's own driver, started on first use
+_helper_pool = None
+
+def _open_currency_dropdown(driver):
+    """
+    Wait for the prices and open the footer currency dropdown.
+
+    :return: The dropdown WebElement
+    :raises DeadlineExceeded: If the prices did not load before the current deadline
+    """
+    # Wait for page to load
+    try:
+        WebDriverWait(driver, wait_timeout()).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "js-price-value"))
+        )
+    except TimeoutException:
+        # Report a wait cut short by the deadline as timed out
+        current_deadline().check()
+        raise
+    
+    # Find currency dropdown using multiple strategies
+    try:
+        currency_dropdown = WebDriverWait(driver, wait_timeout()).until(
+            EC.element_to_be_clickable((By.ID, "js-currency-sort-footer"))
+        )
+    except TimeoutException:
+        # Fallback to finding by CSS selector
+        currency_dropdown = driver.find_element(By.CSS_SELECTOR, "#js-currency-sort-footer")
+    
+    # Force scroll and click using JavaScript
+    driver.execute_script("arguments[0].scrollIntoView(true);", currency_dropdown)
+    
+    # Try multiple ways to open dropdown
+    try:
+        driver.execute_script("arguments[0].click();", currency_dropdown)
+    except Exception:
+        ActionChains(driver).move_to_element(currency_dropdown).click().perform()
+    
+    # Wait for the dropdown to open
+    wait_for_visible(driver, CURRENCY_OPTION_SELECTOR)
+    return currency_dropdown
+
+def _currency_testcase(currency_option):
+    return f"Currency Change to {currency_option['code'] or 'Unknown'}"
+
+def _currency_result(page_url, currency_option, passed, comments):
+    return {
+        'page_url': page_url,
+        'testcase': _currency_testcase(currency_option),
+        'passed': passed,
+        'comments': comments
+    }
+
+def _check_currencies(driver, page_url, indexed_options, page_loaded=False):
+    """
+    Switch to each given currency in turn on one browser session and check all price tiles.
+    Currencies not reached before the current deadline are reported as timed out.
+    
+    :param driver: Selenium WebDriver
+    :param page_url: URL of the page to test
+    :param indexed_options: List of (dropdown index, currency option) tuples
+    :param page_loaded: The page is already loaded with the dropdown open in this driver
+    :return: List of (dropdown index, test result) tuples
+    """
+    results = []
+    template = Config.CURRENCY_URL_TEMPLATE
+    deadline = current_deadline()
+    currency_dropdown = None
+    try:
+        if not page_loaded and not template:
+            load_page(driver, page_url)
+            currency_dropdown = _open_currency_dropdown(driver)
+        elif page_loaded:
+            currency_dropdown = driver.find_element(By.CSS_SELECTOR, "#js-currency-sort-footer")
+    except DeadlineExceeded as e:
+        return [(index, timed_out_result(page_url, _currency_testcase(option), e)) for index, option in indexed_options]
+    
+    for position, (index, currency_option) in enumerate(indexed_options):
+        try:
+            if template:
+                # The site selects the currency from the URL, no dropdown needed
+                load_page(driver, template.format(url=page_url, code=currency_option['code']))
+            else:
+                # Force click using JavaScript
+                driver.execute_script(CLICK_CURRENCY_OPTION_JS, CURRENCY_OPTION_SELECTOR, index)
+            
+            # Wait for price update; the prices of all property tiles come back in the same call
+            test_passed, updated_prices = wait_for_all_text(driver, PRICE_SELECTOR, currency_option['symbol'])
+            if not test_passed and deadline.expired:
+                # The wait was cut short by the deadline, not by the prices
+                deadline.check()
+            results.append((index, _currency_result(page_url, currency_option, test_passed,
+                                                    f"Updated prices: {updated_prices}")))
+            
+            if not template:
+                # Reopen dropdown to change to next currency
+                driver.execute_script("arguments[0].click();", currency_dropdown)
+                wait_for_visible(driver, CURRENCY_OPTION_SELECTOR)
+            
+        except DeadlineExceeded as e:
+            # Cancel the currencies left on this session
+            print(f"Currency checks timed out: {str(e)}")
+            results.extend((index, timed_out_result(page_url, _currency_testcase(option), e))
+                           for index, option in indexed_options[position:])
+            break
+        except Exception as e:
+            print(f"Error processing currency {currency_option['code'] or 'Unknown'}: {str(e)}")
+            results.append((index, _currency_result(page_url, currency_option, False, f"Test failed: {str(e)}")))
+    return results
+
+def _get_helper_pool():
+    # Extra browser sessions of this process for parallel currency checks, quit at exit
+    global _helper_pool
+    if _helper_pool is None:
+        profile_name = Config.TEST_LOAD_PROFILES.get('currency_filter_test', Config.LOAD_PROFILE)
+        _helper_pool = DriverPool(size=Config.CURRENCY_WORKERS - 1,
+                                  factory=lambda: get_chrome_driver(profile_name))
+        Finalize(None, _helper_pool.close, exitpriority=10)
+    return _helper_pool
+
+def _check_on_helper(page_url, indexed_options, deadline):
+    profile_name = Config.TEST_LOAD_PROFILES.get('currency_filter_test', Config.LOAD_PROFILE)
+    with deadline_scope(deadline), _get_helper_pool().session() as driver:
+        apply_load_profile(driver, profile_name)
+        return _check_currencies(driver, page_url, indexed_options)
+
+def run_currency_filter_test(driver, page_url=None, save_report=True):
     """
     Robust test to ensure property tile currency changes when selecting different currencies.
+    The currency list is read once. With Config.CURRENCY_WORKERS above 1 the currencies
+    are split across that many browser sessions and checked in parallel.
     
     :param driver: Selenium WebDriver
+    :param page_url: URL of the page to test; Config.TEST_SITE_URL if not given
+    :param save_report: Write the results to the Excel report; disable when results are merged across pages
     :return: List of test results
     """
     test_results = []
-    base_url = Config.TEST_SITE_URL
+    base_url = page_url or Config.TEST_SITE_URL
     page_url = base_url
 
     try:
         # Navigate to the test URL
         print("Starting currency filtering test...")
-        driver.get(base_url)
+        load_page(driver, base_url)
         
-        # Wait for page to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "js-price-value"))
-        )
-        
-        # Find currency dropdown using multiple strategies
-        try:
-            currency_dropdown = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "js-currency-sort-footer"))
-            )
-        except TimeoutException:
-            # Fallback to finding by CSS selector
-            currency_dropdown = driver.find_element(By.CSS_SELECTOR, "#js-currency-sort-footer")
+        # Open the dropdown, then read all currency options in one call
+        _open_currency_dropdown(driver)
+        currency_options = driver.execute_script(READ_CURRENCY_OPTIONS_JS, CURRENCY_OPTION_SELECTOR)
+        print(f"Found {len(currency_options)} currency options.")
         
-        # Force scroll and click using JavaScript
-        driver.execute_script("arguments[0].scrollIntoView(true);", currency_dropdown)
-        time.sleep(2)  # Allow time for scroll
+        # Deal the currencies out round-robin; this driver keeps the first share
+        workers = max(1, min(Config.CURRENCY_WORKERS, len(currency_options)))
+        indexed_options = list(enumerate(currency_options))
+        shares = [indexed_options[i::workers] for i in range(workers)]
         
-        # Try multiple ways to open dropdown
+        futures = []
+        executor = None
+        if workers > 1:
+            executor = ThreadPoolExecutor(max_workers=workers - 1, thread_name_prefix='currency-check')
+            futures = [executor.submit(PROFILER.wrap(_check_on_helper), page_url, share, current_deadline())
+                       for share in shares[1:]]
         try:
-            driver.execute_script("arguments[0].click();", currency_dropdown)
-        except Exception:
-            ActionChains(driver).move_to_element(currency_dropdown).click().perform()
+            indexed_results = _check_currencies(driver, page_url, shares[0], page_loaded=True)
+            for future, share in zip(futures, shares[1:]):
+                try:
+                    indexed_results.extend(future.result())
+                except Exception as e:
+                    print(f"Currency check session failed: {str(e)}")
+                    indexed_results.extend((index, _currency_result(page_url, option, False, f"Test failed: {str(e)}"))
+                                           for index, option in share)
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
-        # Wait and get currency options
-        time.sleep(2)  # Additional wait for dropdown to populate
-        currency_options = driver.find_elements(By.CSS_SELECTOR, "#js-currency-sort-footer .select-ul li")
-        print(f"Found {len(currency_options)} currency options.")
-        
-        # Iterate through currency options
-        for currency_option in currency_options:
-            try:
-                # Extract currency details
-                currency_code = currency_option.get_attribute("data-currency-country") or "Unknown"
-                currency_symbol = currency_option.find_element(By.TAG_NAME, "p").text.strip()
-                
-                # Force click using JavaScript
-                driver.execute_script("arguments[0].click();", currency_option)
-                
-                # Wait for price update
-                WebDriverWait(driver, 10).until(
-                    EC.text_to_be_present_in_element(
-                        (By.CLASS_NAME, "js-price-value"), currency_symbol
-                    )
-                )
-                
-                # Get all price elements (property tiles) on the page
-                property_tiles = driver.find_elements(By.CLASS_NAME, "js-price-value")
-                
-                # Get updated price for each property tile
-                updated_prices = [tile.text for tile in property_tiles]
-                
-                # Check if all property tiles have the correct currency symbol
-                test_passed = all(currency_symbol in price for price in updated_prices)
-                
-                # Append test result
-                test_results.append({
-                    'page_url': page_url,
-                    'testcase': f"Currency Change to {currency_code}",
-                    'passed': test_passed,
-                    'comments': f"Updated prices: {updated_prices}"
-                })
-                
-                # Reopen dropdown to change to next currency
-                driver.execute_script("arguments[0].click();", currency_dropdown)
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error processing currency {currency_code}: {str(e)}")
-                test_results.append({
-                    'page_url': page_url,
-                    'testcase': f"Currency Change to {currency_code}",
-                    'passed': False,
-                    'comments': f"Test failed: {str(e)}"
-                })
+        # Report in dropdown order
+        test_results.extend(result for _, result in sorted(indexed_results, key=lambda item: item[0]))
         
         # Generate report
-        ExcelReporter.generate_report(test_results, 'currency_filtering_test')
-        print("Currency filtering test completed. Results saved.")
+        if save_report:
+            ExcelReporter.generate_report(test_results, REPORT_NAME)
+        print("Currency filtering test completed.")
         
+    except DeadlineExceeded as e:
+        print(f"Currency filtering test timed out: {str(e)}")
+        test_results.append(timed_out_result(page_url, "Currency Change Test", e))
     except Exception as e:
         print(f"Critical error during test: {str(e)}")
         test_results.append({
@@ -117,7 +229,7 @@ def run_currency_filter_test(driver):
 
 
 if __name__ == "__main__":
-    driver = get_chrome_driver()
+    driver = get_chrome_driver(Config.TEST_LOAD_PROFILES.get('currency_filter_test'))
     try:
         results = run_currency_filter_test(driver)
     finally:
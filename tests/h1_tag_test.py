@@ -1,15 +1,17 @@
-from selenium.webdriver.common.by import By
 from config.config import Config
 from utils.excel_reporter import ExcelReporter
-from utils.web_utils import wait_for_element
-from drivers.chrome_driver import get_chrome_driver
+from utils.page_snapshot import capture_snapshot
 
+REPORT_NAME = 'h1_tag_homepage_test'
 
-def run_h1_tag_test(driver):
+
+def run_h1_tag_test(driver, snapshot=None, save_report=True):
     """
     Test for H1 tag existence only on the homepage.
     
     :param driver: Selenium WebDriver
+    :param snapshot: PageSnapshot of the page; the page is loaded in the driver if not given
+    :param save_report: Write the results to the Excel report; disable when results are merged across pages
     :return: List of test results
     """
     test_results = []
@@ -18,21 +20,23 @@ def run_h1_tag_test(driver):
     try:
         # First, check the homepage for H1 tag existence
         print("Starting h1 tag test...")
-        driver.get(base_url)
-        wait_for_element(driver, By.TAG_NAME, 'h1')
+        if snapshot is None:
+            snapshot = capture_snapshot(driver, base_url)
+        base_url = snapshot.url
 
-        # Find H1 tags on the homepage
-        h1_elements = driver.find_elements(By.TAG_NAME, 'h1')
+        # Count H1 tags on the homepage
+        h1_count = snapshot.headings.count('h1')
         test_results.append({
             'page_url': base_url,
             'testcase': 'H1 Tag Existence',
-            'passed': len(h1_elements) > 0,
-            'comments': f'Found {len(h1_elements)} H1 tags' if h1_elements else 'No H1 tag found'
+            'passed': h1_count > 0,
+            'comments': f'Found {h1_count} H1 tags' if h1_count else 'No H1 tag found'
         })
 
         # Generate a consolidated report
-        ExcelReporter.generate_report(test_results, 'h1_tag_homepage_test')
-        print("h1 tag test completed. Results saved.")
+        if save_report:
+            ExcelReporter.generate_report(test_results, REPORT_NAME)
+        print("h1 tag test completed.")
         
     except Exception as e:
         print(f"Error occurred during the test: {str(e)}")
@@ -41,6 +45,7 @@ def run_h1_tag_test(driver):
 
 
 if __name__ == "__main__":
+    from drivers.chrome_driver import get_chrome_driver
     driver = get_chrome_driver()
     
     try:
@@ -1,8 +1,8 @@
-from selenium.webdriver.common.by import By
 from config.config import Config
 from utils.excel_reporter import ExcelReporter
-from utils.web_utils import wait_for_element
-from drivers.chrome_driver import get_chrome_driver
+from utils.page_snapshot import capture_snapshot
+
+REPORT_NAME = 'html_tag_sequence_homepage_test'
 
 def check_html_tag_sequence(tags):
     """
@@ -32,11 +32,13 @@ def check_html_tag_sequence(tags):
     return is_correct, missing_tags, broken_sequence, tag_sequence
 
 
-def run_html_tag_sequence_test(driver):
+def run_html_tag_sequence_test(driver, snapshot=None, save_report=True):
     """
     Test for HTML tag sequence (H1-H6) existence and order on the homepage only.
     
     :param driver: Selenium WebDriver
+    :param snapshot: PageSnapshot of the page; the page is loaded in the driver if not given
+    :param save_report: Write the results to the Excel report; disable when results are merged across pages
     :return: List of test results
     """
     test_results = []
@@ -45,14 +47,12 @@ def run_html_tag_sequence_test(driver):
     try:
         # Check the homepage for H1-H6 tag sequence
         print("Starting HTML tag sequence test...")
-        driver.get(base_url)
-        wait_for_element(driver, By.TAG_NAME, 'h1')
-
-        # Get all heading tags from H1 to H6
-        heading_tags = driver.find_elements(By.XPATH, '//h1 | //h2 | //h3 | //h4 | //h5 | //h6')
+        if snapshot is None:
+            snapshot = capture_snapshot(driver, base_url)
+        base_url = snapshot.url
 
-        # Extract the tag names
-        tag_names = [tag.tag_name for tag in heading_tags]
+        # Tag names of all heading tags from H1 to H6
+        tag_names = snapshot.headings
 
         # Check the sequence of the heading tags
         is_sequence_correct, missing_tags, broken_sequence, detected_sequence = check_html_tag_sequence(tag_names)
@@ -78,8 +78,9 @@ def run_html_tag_sequence_test(driver):
         })
 
         # Generate a consolidated report
-        ExcelReporter.generate_report(test_results, 'html_tag_sequence_homepage_test')
-        print("HTML tag sequence test completed. Results saved.")
+        if save_report:
+            ExcelReporter.generate_report(test_results, REPORT_NAME)
+        print("HTML tag sequence test completed.")
 
     except Exception as e:
         print(f"Error occurred during the test: {str(e)}")
@@ -94,6 +95,7 @@ def run_html_tag_sequence_test(driver):
 
 
 if __name__ == "__main__":
+    from drivers.chrome_driver import get_chrome_driver
     driver = get_chrome_driver()
     
     try:
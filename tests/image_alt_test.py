@@ -1,17 +1,17 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from config.config import Config
 from utils.excel_reporter import ExcelReporter
-from drivers.chrome_driver import get_chrome_driver
-from utils.web_utils import wait_for_element
+from utils.page_snapshot import capture_snapshot
 
-def run_image_alt_test(driver):
+REPORT_NAME = 'image_alt_attribute_test'
+
+def run_image_alt_test(driver, snapshot=None, save_report=True):
     """
     Test to ensure that all images on the page have an alt attribute.
     If all images have alt text, report Pass. Otherwise, report Fail with details of missing alt attributes.
     
     :param driver: Selenium WebDriver
+    :param snapshot: PageSnapshot of the page; the page is loaded in the driver if not given
+    :param save_report: Write the results to the Excel report; disable when results are merged across pages
     :return: List of test results
     """
     test_results = []
@@ -19,15 +19,14 @@ def run_image_alt_test(driver):
     all_images_have_alt = True  # Flag to check if all images pass
 
     try:
-        # Navigate to the test URL
+        # Load the test URL unless a snapshot is shared
         print("Starting image alt attribute test..")
-        driver.get(base_url)
-
-        # Wait for the page to load
-        wait_for_element(driver, By.TAG_NAME, "img")
+        if snapshot is None:
+            snapshot = capture_snapshot(driver, base_url)
+        base_url = snapshot.url
 
-        # Find all images on the page
-        images = driver.find_elements(By.TAG_NAME, "img")
+        # All images on the page
+        images = snapshot.images
         print(f"Found {len(images)} images on the page.")
 
         # List to store the missing alt text image sources
@@ -35,12 +34,12 @@ def run_image_alt_test(driver):
 
         # Iterate through all images and check the alt attribute
         for image in images:
-            alt_text = image.get_attribute("alt")
+            alt_text = image['alt']
 
             # If alt attribute is missing, log the failure
             if not alt_text:
                 all_images_have_alt = False
-                missing_alt_images.append(image.get_attribute('src'))
+                missing_alt_images.append(image['src'] or '')
 
         # Prepare the test result
         if all_images_have_alt:
@@ -59,9 +58,10 @@ def run_image_alt_test(driver):
             })
 
         # Generate an Excel report
-        print("Generating Excel report...")
-        ExcelReporter.generate_report(test_results, 'image_alt_attribute_test')
-        print("Image alt attribute test completed. Results saved.")
+        if save_report:
+            print("Generating Excel report...")
+            ExcelReporter.generate_report(test_results, REPORT_NAME)
+        print("Image alt attribute test completed.")
 
     except Exception as e:
         print(f"Error occurred during the test: {str(e)}")
@@ -76,6 +76,7 @@ def run_image_alt_test(driver):
 
 
 if __name__ == "__main__":
+    from drivers.chrome_driver import get_chrome_driver
     # Setup WebDriver
     driver = get_chrome_driver()
     try:
@@ -0,0 +1,87 @@
+import importlib
+
+# What a test needs to run
+SNAPSHOT = 'snapshot'  # Only reads the shared page snapshot
+NETWORK = 'network'  # Reads the snapshot and makes its own HTTP requests, no browser
+BROWSER = 'browser'  # Drives the live browser
+
+
+class TestSpec:
+    """
+    A registered test: how to run it, what it needs and where its results go.
+    """
+
+    def __init__(self, name, runner, needs, report_name=None):
+        """
+        :param name: Name used in Config.TESTS_TO_RUN
+        :param runner: Runner function, or its import path as 'module:function' so the module
+                       and its dependencies are only imported when the test runs. Called as
+                       runner(driver, snapshot) for snapshot and network tests and as
+                       runner(driver, page_url) for browser tests
+        :param needs: SNAPSHOT, NETWORK or BROWSER
+        :param report_name: Report sheet the results are written to; the runner module's
+                            REPORT_NAME if not given
+        """
+        self.name = name
+        self._runner = runner
+        self.needs = needs
+        self._report_name = report_name
+
+    @property
+    def runner(self):
+        if isinstance(self._runner, str):
+            module_name, function_name = self._runner.split(':')
+            self._runner = getattr(importlib.import_module(module_name), function_name)
+        return self._runner
+
+    @property
+    def report_name(self):
+        if self._report_name is None:
+            self._report_name = importlib.import_module(self.runner.__module__).REPORT_NAME
+        return self._report_name
+
+    def run(self, driver, url, snapshot):
+        """
+        Run the test against one page without writing the report.
+
+        :param driver: Selenium WebDriver, or None for tests that don't need a browser
+        :param url: URL of the page
+        :param snapshot: PageSnapshot of the page, or None for browser tests
+        :return: List of test results
+        """
+        if self.needs == BROWSER:
+            return self.runner(driver, url, save_report=False)
+        return self.runner(driver, snapshot, save_report=False)
+
+
+TESTS = {}
+
+
+def register(spec):
+    """
+    Add a test to the registry so it can be selected by name.
+    """
+    TESTS[spec.name] = spec
+    return spec
+
+
+def get_tests(names):
+    """
+    Look up tests by name.
+
+    :param names: Test names, e.g. Config.TESTS_TO_RUN
+    :return: List of TestSpec in the given order
+    :raises ValueError: If a name is not registered
+    """
+    unknown = [name for name in names if name not in TESTS]
+    if unknown:
+        raise ValueError(f"Unknown test(s): {', '.join(unknown)}. Available tests: {', '.join(TESTS)}")
+    return [TESTS[name] for name in names]
+
+
+register(TestSpec('h1_tag_test', 'tests.h1_tag_test:run_h1_tag_test', SNAPSHOT))
+register(TestSpec('html_tag_sequence_test', 'tests.html_tag_sequence_test:run_html_tag_sequence_test', SNAPSHOT))
+register(TestSpec('image_alt_test', 'tests.image_alt_test:run_image_alt_test', SNAPSHOT))
+register(TestSpec('url_status_test', 'tests.url_status_test:run_url_status_test', NETWORK))
+register(TestSpec('currency_filter_test', 'tests.currency_filter_test:run_currency_filter_test', BROWSER))
+register(TestSpec('script_data_test', 'tests.script_data_test:run_scraping_and_save_report', SNAPSHOT))
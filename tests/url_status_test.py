@@ -1,80 +1,124 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
 from config.config import Config
-from utils.web_utils import check_url_status
+from utils.link_checker import LinkChecker
+from utils.link_cache import open_link_cache
+from utils.deadline import timed_out_result
 from utils.excel_reporter import ExcelReporter
-from drivers.chrome_driver import get_chrome_driver
+from utils.page_snapshot import capture_snapshot
 
-def run_url_status_test(driver):
+REPORT_NAME = 'broken_url_status_test'
+
+def run_url_status_test(driver, snapshot=None, save_report=True):
     """
     Test URL status codes for unique links on the homepage.
-    Save only broken/missing URLs (404) in the report. 
-    Show "All Pass" if no 404s are found.
+    Links are checked concurrently over pooled keep-alive connections,
+    and only stale or unseen links are requested when the link cache is enabled.
+    Images, scripts and stylesheets the browser already loaded are checked from
+    its network log without extra requests; images its load profile blocked are
+    requested like links instead.
+    Save only broken URLs (4xx/5xx status or no response) in the report. 
+    Show "All Pass" if no broken URLs are found.
+    Links still unchecked when the test's deadline passes are reported as one "Timed out" result.
     
     :param driver: Selenium WebDriver
-    :return: List of test results
+    :param snapshot: PageSnapshot of the page; the page is loaded in the driver if not given
+    :param save_report: Write the results to the Excel report; disable when results are merged across pages
+    :return: List of reported test results
     """
     test_results = []
     unique_urls = set()  # Set to store unique URLs
     broken_urls = []  # List to store only broken URLs
     
     try:
-        # Open the base URL (homepage)
+        # Open the base URL (homepage) unless a snapshot is shared
         print("Starting url status test...")
-        driver.get(Config.TEST_SITE_URL)
-        
-        # Find all links on the page
-        links = driver.find_elements(By.TAG_NAME, 'a')
+        if snapshot is None:
+            snapshot = capture_snapshot(driver, Config.TEST_SITE_URL)
         
-        for link in links:
-            href = link.get_attribute('href')
+        # All links on the page
+        for href in snapshot.links:
             if href and href.startswith('http'):
                 unique_urls.add(href)  # Add URL to the set (ensures uniqueness)
         
-        # Test each unique URL
-        for url in unique_urls:
-            status_code = check_url_status(url)
-            
-            # Check if the URL is broken (status code is 404)
-            if status_code == 404:
+        # Subresources the browser loaded, with statuses from its network log
+        resources = snapshot.resources or {}
+        for url, status in resources.items():
+            if status.is_broken:
+                broken_urls.append({
+                    'page_url': snapshot.url,
+                    'testcase': 'Resource Status Check',
+                    'passed': False,
+                    'comments': f'Broken {status.resource_type.lower()}: {url} ({status.describe()})'
+                })
+        if resources:
+            print(f"Read {len(resources)} resource statuses from the network log.")
+        
+        # Images the load profile blocked never reach the network log
+        image_urls = set()
+        if 'image' in snapshot.blocked_resource_types:
+            image_urls = {image['src'] for image in snapshot.images
+                          if image.get('src') and image['src'].startswith('http')} - unique_urls
+        
+        # Test all unique URLs concurrently, except those the browser already loaded
+        with LinkChecker(cache=open_link_cache()) as checker:
+            statuses = checker.check_all(sorted((unique_urls | image_urls) - set(resources)))
+        cached_count = sum(1 for status in statuses.values() if status.from_cache)
+        print(f"Checked {len(statuses)} unique URLs ({cached_count} from cache).")
+        
+        timed_out = [url for url, status in statuses.items() if status.timed_out]
+        for url, status in statuses.items():
+            # Check if the URL is broken, keeping the real status code
+            if status.is_broken and not status.timed_out and url in image_urls:
+                broken_urls.append({
+                    'page_url': snapshot.url,
+                    'testcase': 'Resource Status Check',
+                    'passed': False,
+                    'comments': f'Broken image: {url} ({status.describe()})'
+                })
+            elif status.is_broken and not status.timed_out:
                 result = {
-                    'property_page_url': driver.current_url,
+                    'page_url': snapshot.url,
                     'testcase': 'URL Status Check',
                     'passed': False,
-                    'comments': f'Broken URL: {url} '
+                    'comments': f'Broken URL: {url} ({status.describe()})'
                 }
                 broken_urls.append(result)  # Collect only broken URLs
+        if timed_out:
+            broken_urls.append(timed_out_result(snapshot.url, 'URL Status Check',
+                                                f"{len(timed_out)} of {len(statuses)} links not checked before the deadline"))
+            print(f"{len(timed_out)} URLs not checked before the deadline.")
             
         # Save only broken URLs to the report
         if broken_urls:
-            ExcelReporter.generate_report(broken_urls, 'broken_url_status_test')
-            print(f"Broken URLs found: {len(broken_urls)}. Results saved.")
+            test_results = broken_urls
+            print(f"Broken URLs found: {len(broken_urls)}.")
         else:
             # If no broken URLs, create a simple "All Pass" report
             test_results.append({
-                'property_page_url': driver.current_url,
+                'page_url': snapshot.url,
                 'testcase': 'URL Status Check',
                 'passed': True,
-                'comments': 'All Pass. No 404 errors found.'
+                'comments': 'All Pass. No broken URLs found.'
             })
-            ExcelReporter.generate_report(test_results, 'broken_url_status_test')
             print("All Pass. No broken URLs found.")
         
     except Exception as e:
         # Handle exceptions and save error details
         result = {
-            'page_url': Config.TEST_SITE_URL,
+            'page_url': snapshot.url if snapshot is not None else Config.TEST_SITE_URL,
             'testcase': 'URL Status Check',
             'passed': False,
             'comments': f'Error: {str(e)}'
         }
         test_results.append(result)
-        ExcelReporter.generate_report(test_results, 'broken_url_status_test')
-        print("An error occurred. Results saved.")
+        print("An error occurred.")
     
-    return broken_urls
+    if save_report:
+        ExcelReporter.generate_report(test_results, REPORT_NAME)
+        print("Results saved.")
+    return test_results
 
 if __name__ == "__main__":
+    from drivers.chrome_driver import get_chrome_driver
     # Initialize WebDriver (make sure ChromeDriver is installed and in PATH)
     driver = get_chrome_driver()
     
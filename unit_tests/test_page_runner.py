@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from config.config import Config
+from tests import registry
+from utils import page_runner
+from utils.deadline import current_deadline
+from utils.page_snapshot import PageSnapshot
+
+PAGE_URL = 'https://example.com/property/1'
+
+REPORT_NAME = 'slow_snapshot_test'
+
+
+def _slow_snapshot_test(driver, snapshot, save_report=False):
+    # Outlasts its budget and is cut short at the deadline
+    time.sleep(0.1)
+    current_deadline().check()
+    return [{'page_url': snapshot.url, 'testcase': 'Slow', 'passed': True, 'comments': ''}]
+
+
+def _snapshot(url):
+    return PageSnapshot(url, '<h1>Page</h1>', ['h1'], [], [], [])
+
+
+class IncrementalDeadlineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._config = {name: getattr(Config, name) for name in
+                        ('ENGINE', 'INCREMENTAL_ENABLED', 'PAGE_STATE_PATH', 'TEST_DEADLINES', 'MEMORY_MONITOR_ENABLED')}
+        Config.ENGINE = 'static'
+        Config.INCREMENTAL_ENABLED = True
+        Config.PAGE_STATE_PATH = os.path.join(self._dir.name, 'page_state.sqlite')
+        Config.MEMORY_MONITOR_ENABLED = False
+        registry.register(registry.TestSpec('slow_snapshot_test', _slow_snapshot_test, registry.SNAPSHOT,
+                                            report_name=REPORT_NAME))
+
+    def tearDown(self):
+        page_runner.close_page_state()
+        registry.TESTS.pop('slow_snapshot_test', None)
+        for name, value in self._config.items():
+            setattr(Config, name, value)
+        self._dir.cleanup()
+
+    def test_result_cut_short_by_test_deadline_is_not_carried_forward(self):
+        Config.TEST_DEADLINES = {'slow_snapshot_test': 0.05}
+        with mock.patch.object(page_runner, 'fetch_static_snapshot', _snapshot):
+            first = page_runner.run_page(None, PAGE_URL, ['slow_snapshot_test'])
+            second = page_runner.run_page(None, PAGE_URL, ['slow_snapshot_test'])
+
+        self.assertTrue(first[REPORT_NAME][0]['comments'].startswith('Timed out'))
+        self.assertFalse(second[REPORT_NAME][0]['carried_forward'])
+
+    def test_result_within_its_budget_is_carried_forward(self):
+        Config.TEST_DEADLINES = {'slow_snapshot_test': 5}
+        with mock.patch.object(page_runner, 'fetch_static_snapshot', _snapshot):
+            page_runner.run_page(None, PAGE_URL, ['slow_snapshot_test'])
+            second = page_runner.run_page(None, PAGE_URL, ['slow_snapshot_test'])
+
+        self.assertTrue(second[REPORT_NAME][0]['carried_forward'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from config.config import Config
+from utils.script_data import extract_script_data, export_fields, parse_object_literal
+
+
+class UnsupportedValueTest(unittest.TestCase):
+
+    def test_unparseable_values_do_not_cost_campaign_id(self):
+        scripts = ["ScriptData.pageData = {Validator: /^[A-Z]{2},\\d+$/g, CampaignId: 'C-42', "
+                   "Color: 0xFF00FF, Title: `${name} page`, Opened: new Date(2020, 1)};"]
+
+        row = export_fields(extract_script_data(scripts), Config.SCRIPT_DATA_FIELDS)
+
+        self.assertEqual(row['CampaignID'], 'C-42')
+
+    def test_unsupported_values_become_none(self):
+        value = parse_object_literal("{pattern: /a,b/i, hex: 0x1F, plain: `text`, sub: `${x}`, call: f(1, 2)}")
+
+        self.assertEqual(value, {'pattern': None, 'hex': 31, 'plain': 'text', 'sub': None, 'call': None})
+
+    def test_unclosed_literal_is_not_parsed(self):
+        self.assertIsNone(parse_object_literal("{CampaignId: 'C-42'"))
+
+
+if __name__ == "__main__":
+    unittest.main()
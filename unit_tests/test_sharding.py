@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+from utils.sharding import merge_shards
+
+
+class MergeShardsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.directory = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_missing_store_is_an_error_and_not_created(self):
+        path = os.path.join(self.directory, 'shard_1_of_2.sqlite')
+        with self.assertRaisesRegex(ValueError, 'No result store'):
+            merge_shards([path], os.path.join(self.directory, 'merged.xlsx'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_file_that_is_not_a_store_is_an_error(self):
+        path = os.path.join(self.directory, 'notes.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('not a database')
+        with self.assertRaisesRegex(ValueError, 'Not a result store'):
+            merge_shards([path], os.path.join(self.directory, 'merged.xlsx'))
+
+
+if __name__ == "__main__":
+    unittest.main()
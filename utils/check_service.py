@@ -0,0 +1,247 @@
+import json
+import os
+import signal
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.config import Config
+from tests.registry import TESTS, get_tests
+from utils.link_cache import close_shared_link_cache
+from utils.link_checker import close_shared_link_sessions
+from utils.page_runner import needs_browser, run_page_with_pool, close_page_state
+
+
+class CheckService:
+    """
+    Long-running checker that keeps browsers, the link cache and the page state
+    open between jobs. A job is a list of URLs and test names; its pages share one
+    bounded pool of workers with the pages of every other job.
+    """
+
+    def __init__(self, workers=None, max_queued_jobs=None):
+        """
+        :param workers: Pages checked at the same time; Config.SERVICE_WORKERS if not given
+        :param max_queued_jobs: Jobs accepted at once; Config.SERVICE_MAX_QUEUED_JOBS if not given
+        """
+        self.workers = workers or Config.SERVICE_WORKERS
+        self.max_queued_jobs = max_queued_jobs or Config.SERVICE_MAX_QUEUED_JOBS
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='check-service')
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._jobs = threading.BoundedSemaphore(self.max_queued_jobs)
+        self._active_jobs = 0
+        self._counter_lock = threading.Lock()
+
+    def _driver_pool(self, tests):
+        # Browsers are started on the first job that needs one and then kept warm
+        if not needs_browser(tests):
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                from drivers.driver_pool import DriverPool
+                self._pool = DriverPool(size=self.workers)
+            return self._pool
+
+    def warm_up(self, tests):
+        """
+        Start one browser ahead of the first job if the given tests need one.
+        A browser that fails to start is only reported; jobs that need one will fail
+        on their own, and the others still run.
+        """
+        pool = self._driver_pool(tests)
+        if pool is None:
+            return
+        try:
+            pool.release(pool.acquire(), reset=False)
+        except Exception as e:
+            print(f"Warning: could not start a browser ahead of the first job: {e}")
+
+    def validate(self, job):
+        """
+        Check a job request.
+
+        :param job: Dictionary with 'urls' and optionally 'tests'
+        :return: Tuple (urls, test names)
+        :raises ValueError: If the job is malformed
+        """
+        if not isinstance(job, dict):
+            raise ValueError("Job must be a JSON object with 'urls' and optionally 'tests'")
+        urls = job.get('urls')
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls or not all(isinstance(url, str) and url.startswith('http') for url in urls):
+            raise ValueError("'urls' must be a non-empty list of http(s) URLs")
+        if len(urls) > Config.SERVICE_MAX_URLS_PER_JOB:
+            raise ValueError(f"At most {Config.SERVICE_MAX_URLS_PER_JOB} URLs per job")
+        tests = job.get('tests') or Config.TESTS_TO_RUN
+        if isinstance(tests, str):
+            tests = [tests]
+        if not isinstance(tests, list) or not all(isinstance(name, str) for name in tests):
+            raise ValueError("'tests' must be a test name or a list of test names")
+        get_tests(tests)
+        return list(dict.fromkeys(urls)), tests
+
+    def try_start_job(self):
+        """
+        Reserve a job slot.
+
+        :return: False if the service is at its job limit
+        """
+        if not self._jobs.acquire(blocking=False):
+            return False
+        with self._counter_lock:
+            self._active_jobs += 1
+        return True
+
+    def finish_job(self):
+        with self._counter_lock:
+            self._active_jobs -= 1
+        self._jobs.release()
+
+    def run_job(self, urls, tests):
+        """
+        Check the pages of a job on the shared workers.
+
+        :return: Iterator over dictionaries {'url': ..., 'results': {sheet name: rows}}, in URL order
+        """
+        pool = self._driver_pool(tests)
+        futures = [self._executor.submit(run_page_with_pool, pool, url, tests) for url in urls]
+        for url, future in zip(urls, futures):
+            yield {'url': url, 'results': future.result()}
+
+    def status(self):
+        return {
+            'status': 'ok',
+            'engine': Config.ENGINE,
+            'workers': self.workers,
+            'active_jobs': self._active_jobs,
+            'max_queued_jobs': self.max_queued_jobs,
+            'browsers_started': self._pool is not None and self._pool.started > 0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
+        close_shared_link_cache()
+        close_shared_link_sessions()
+        close_page_state()
+
+
+class _JobHandler(BaseHTTPRequestHandler):
+    """
+    GET /health, GET /tests, and POST /jobs with {"urls": [...], "tests": [...]}.
+    Job results are streamed back as JSON Lines, one line per page as it finishes,
+    followed by a {"done": true, ...} line.
+    """
+
+    service = None  # Set on the server's handler class
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.service.status())
+        elif self.path == '/tests':
+            self._send_json(200, {name: spec.needs for name, spec in TESTS.items()})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/jobs':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            urls, tests = self.service.validate(json.loads(self.rfile.read(length) or b'null'))
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        if not self.service.try_start_job():
+            self._send_json(503, {'error': 'Too many jobs, try again later'})
+            return
+
+        started = time.perf_counter()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            for page in self.service.run_job(urls, tests):
+                self._write_line(page)
+            self._write_line({'done': True, 'pages': len(urls), 'seconds': round(time.perf_counter() - started, 3)})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; the job's pages still finish on the workers
+            pass
+        finally:
+            self.service.finish_job()
+
+    def _write_line(self, data):
+        self.wfile.write((json.dumps(data, default=str) + '\n').encode('utf-8'))
+        self.wfile.flush()
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix-socket'
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix-socket', 0)
+
+
+def _stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(host=None, port=None, socket_path=None):
+    """
+    Run the check service until interrupted.
+
+    :param host: Address to listen on; Config.SERVICE_HOST if not given
+    :param port: Port to listen on; Config.SERVICE_PORT if not given
+    :param socket_path: Listen on this Unix socket instead of TCP
+    """
+    # A long-running process keeps one link cache open, and does not collect
+    # profiling events or memory samples that would pile up between jobs;
+    # browsers are still recycled by Config.DRIVER_MAX_PAGES and DRIVER_MAX_MEMORY_MB
+    Config.LINK_CACHE_KEEP_OPEN = True
+    Config.PROFILE_ENABLED = False
+    Config.MEMORY_MONITOR_ENABLED = False
+
+    service = CheckService()
+    handler = type('JobHandler', (_JobHandler,), {'service': service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, handler)
+        where = f"unix socket {socket_path}"
+    else:
+        server = ThreadingHTTPServer((host or Config.SERVICE_HOST, port or Config.SERVICE_PORT), handler)
+        where = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    if threading.current_thread() is threading.main_thread():
+        # Shut down cleanly when stopped by a process manager, too
+        signal.signal(signal.SIGTERM, _stop_on_sigterm)
+
+    try:
+        service.warm_up(Config.TESTS_TO_RUN)
+        print(f"Check service listening on {where} with {service.workers} worker(s), engine '{Config.ENGINE}'.")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping check service...")
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
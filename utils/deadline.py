@@ -0,0 +1,122 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds a test may overrun its deadline to report what it has before its result is abandoned
+RESULT_GRACE = 5
+
+_local = threading.local()
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when work would start or continue past its deadline.
+    """
+
+
+class Deadline:
+    """
+    Point in time by which a page or a test must be done. Page loads, waits and
+    link checks take their timeout from the time left instead of a fixed constant,
+    so a slow page cannot stall a worker for longer than its budget.
+    """
+
+    def __init__(self, seconds=None, name='page', parent=None):
+        """
+        :param seconds: Budget in seconds; no limit if None
+        :param name: What the budget is for, used in timed-out results
+        :param parent: Deadline this one may not outlast, e.g. the page of a test
+        """
+        self.seconds = seconds
+        self.name = name
+        self.parent = parent
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        if parent is not None and parent.expires_at is not None:
+            self.expires_at = parent.expires_at if self.expires_at is None else min(self.expires_at, parent.expires_at)
+
+    def child(self, seconds, name):
+        """
+        Budget of a step inside this one, cut short by this deadline.
+
+        :param seconds: Budget of the step; the rest of this deadline if None
+        :param name: What the step is, e.g. the test name
+        """
+        return Deadline(seconds, name, parent=self)
+
+    def remaining(self):
+        """
+        Seconds left, or None if there is no limit.
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self):
+        """
+        :raises DeadlineExceeded: If no time is left
+        """
+        if not self.expired:
+            return
+        if self.parent is not None and self.parent.expired:
+            self.parent.check()
+        raise DeadlineExceeded(f"{self.name} exceeded its {self.seconds:g}s budget")
+
+    def timeout(self, cap):
+        """
+        Timeout for one blocking step: the time left, at most cap.
+
+        :param cap: Longest the step may take even with time to spare
+        :raises DeadlineExceeded: If no time is left
+        """
+        self.check()
+        remaining = self.remaining()
+        return cap if remaining is None else min(cap, remaining)
+
+
+def current_deadline():
+    """
+    Deadline of the page or test running on this thread; unlimited outside a run.
+    """
+    return getattr(_local, 'deadline', None) or Deadline()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """
+    Make deadline the current deadline of this thread inside the block.
+    """
+    previous = getattr(_local, 'deadline', None)
+    _local.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = previous
+
+
+def is_timed_out(result):
+    """
+    Whether a result reports work cancelled at its deadline rather than a real outcome.
+
+    :param result: Test result dictionary
+    """
+    return str(result.get('comments') or '').startswith('Timed out')
+
+
+def timed_out_result(page_url, testcase, reason):
+    """
+    Result reported for work cancelled at its deadline, distinct from a failed check.
+
+    :param page_url: URL of the page
+    :param testcase: Test case that did not finish
+    :param reason: DeadlineExceeded or a description of what was cut short
+    """
+    return {
+        'page_url': page_url,
+        'testcase': testcase,
+        'passed': False,
+        'comments': f"Timed out: {reason}"
+    }
@@ -1,9 +1,18 @@
 import os
-import pandas as pd
+import shutil
+import tempfile
 from datetime import datetime
+from config.config import Config
+from utils.result_sinks import JsonlSink, CsvSink, ParquetSink, SqliteSink, iter_jsonl_results
+from utils.profiler import PROFILER
+from utils.run_history import RunHistorySink
+
+EXCEL_MAX_ROWS = 1048576  # Rows per worksheet, including the header
+EXCEL_MAX_SHEET_NAME = 31
 
 class ExcelReporter:
     @staticmethod
+    @PROFILER.timed('report')
     def generate_report(test_results, test_name):
         """
         Generate an Excel report for a specific test with multiple sheets in one file.
@@ -11,6 +20,9 @@ class ExcelReporter:
         :param test_results: List of dictionaries containing test results
         :param test_name: Name of the test for report naming
         """
+        # Imported on use, so runs that don't write Excel skip pandas' import time
+        import pandas as pd
+
         # Create reports directory if not exists
         reports_dir = "test_reports"
         os.makedirs(reports_dir, exist_ok=True)
@@ -27,7 +39,7 @@ class ExcelReporter:
         
         # If the file exists, we append data to it
         if file_exists:
-            with pd.ExcelWriter(filename, engine='openpyxl', mode='a', if_sheet_exists='new') as writer:
+            with pd.ExcelWriter(filename, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
                 df.to_excel(writer, index=False, sheet_name=test_name)
         else:
             # If the file doesn't exist, create it and write the data
@@ -36,3 +48,130 @@ class ExcelReporter:
 
         print(f"Report generated: {filename}")
         return filename
+
+
+@PROFILER.timed('report')
+def export_excel(jsonl_path, filename):
+    """
+    Build the Excel report from a JSON Lines result stream in openpyxl write-only mode.
+    Columns of each sheet are the union of its row keys, in first-seen order.
+
+    :param jsonl_path: Result stream written by JsonlSink
+    :param filename: Path of the workbook; an existing report is replaced
+    :return: Path of the workbook, or None if the stream has no results
+    """
+    from openpyxl import Workbook
+
+    # First pass: sheets and their columns
+    columns = {}
+    for sheet_name, row in iter_jsonl_results(jsonl_path):
+        sheet_columns = columns.setdefault(sheet_name, {})
+        for column in row:
+            sheet_columns.setdefault(column, None)
+    if not columns:
+        return None
+
+    # Second pass: stream rows into their worksheets
+    workbook = Workbook(write_only=True)
+    worksheets = {}
+    for sheet_name, row in iter_jsonl_results(jsonl_path):
+        sheet = worksheets.get(sheet_name)
+        if sheet is None or sheet['rows'] >= EXCEL_MAX_ROWS:
+            # Continue in a new worksheet once Excel's row limit is reached
+            part = sheet['part'] + 1 if sheet else 1
+            title = sheet_name if part == 1 else f"{sheet_name[:EXCEL_MAX_SHEET_NAME - 3]}_{part}"
+            worksheet = workbook.create_sheet(title=title[:EXCEL_MAX_SHEET_NAME])
+            worksheet.append(list(columns[sheet_name]))
+            sheet = worksheets[sheet_name] = {'worksheet': worksheet, 'rows': 1, 'part': part}
+        sheet['worksheet'].append([row.get(column) for column in columns[sheet_name]])
+        sheet['rows'] += 1
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Save next to the target and swap in, so a failed write keeps the old report
+    temp_filename = f"{filename}.tmp"
+    workbook.save(temp_filename)
+    os.replace(temp_filename, filename)
+    print(f"Report generated: {filename}")
+    return filename
+
+
+class ReportSession:
+    """
+    Streams the results of a whole run to the configured outputs as each check
+    finishes. Every result goes to a JSON Lines stream; CSV, Parquet and SQLite files
+    are written alongside it, and the Excel workbook is exported once from the
+    stream at the end, so memory stays bounded.
+    """
+
+    def __init__(self, filename=None, formats=None, metadata=None, history=False, history_label=None):
+        """
+        :param filename: Path of the workbook; REPORT_DIRECTORY/REPORT_FILENAME if not given.
+                         The other outputs are named after it.
+        :param formats: Output formats out of 'xlsx', 'jsonl', 'csv', 'parquet' and 'sqlite'; Config.OUTPUT_FORMATS if not given
+        :param metadata: Dictionary of strings stored in the SQLite output, e.g. the shard
+        :param history: Also record the results as a new run in the run history, if Config.HISTORY_ENABLED
+        :param history_label: What the run was, shown in the run list; the workbook path if not given
+        """
+        self.filename = filename or os.path.join(Config.REPORT_DIRECTORY, Config.REPORT_FILENAME)
+        self.formats = set(formats or Config.OUTPUT_FORMATS)
+        directory = os.path.dirname(self.filename) or '.'
+        prefix = os.path.splitext(os.path.basename(self.filename))[0]
+
+        # The stream is kept only if JSON Lines output was asked for
+        if 'jsonl' in self.formats:
+            self._stream_path = os.path.join(directory, f"{prefix}.jsonl")
+        else:
+            self._stream_path = os.path.join(tempfile.mkdtemp(prefix='report_'), 'results.jsonl')
+
+        self.sinks = [JsonlSink(self._stream_path)]
+        if 'csv' in self.formats:
+            self.sinks.append(CsvSink(directory, prefix))
+        if 'parquet' in self.formats:
+            self.sinks.append(ParquetSink(directory, prefix))
+        if 'sqlite' in self.formats:
+            self.sinks.append(SqliteSink(os.path.join(directory, f"{prefix}.sqlite"), metadata=metadata))
+        if history and Config.HISTORY_ENABLED:
+            self.sinks.append(RunHistorySink(label=history_label or self.filename))
+
+    def add(self, test_results, sheet_name):
+        """
+        Append results to every output.
+
+        :param test_results: List of dictionaries containing test results
+        :param sheet_name: Name of the sheet the results belong to
+        """
+        for sink in self.sinks:
+            sink.write(test_results, sheet_name)
+
+    def close(self):
+        """
+        Flush and close every output, then export the Excel workbook from the stream.
+        An output that fails to close does not keep the others from being written;
+        its error is raised once everything else is done.
+
+        :return: Path of the workbook, or None if it was not written
+        """
+        errors = []
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"Failed to close {type(sink).__name__}: {e}")
+                errors.append(e)
+        try:
+            if 'xlsx' in self.formats:
+                return export_excel(self._stream_path, self.filename)
+            return None
+        finally:
+            if 'jsonl' not in self.formats:
+                shutil.rmtree(os.path.dirname(self._stream_path), ignore_errors=True)
+            if errors:
+                raise errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
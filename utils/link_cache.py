@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+from config.config import Config
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Cache shared by every checker of a long-running process, see Config.LINK_CACHE_KEEP_OPEN
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def normalize_url(url):
+    """
+    Normalize a URL for use as a cache key: lowercase scheme and host,
+    drop default ports and fragments, and use '/' for an empty path.
+
+    :param url: URL to normalize
+    :return: Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+class CachedLink:
+    """
+    A cached URL check result.
+    """
+
+    def __init__(self, url, status_code, checked_at, etag=None, last_modified=None):
+        self.url = url
+        self.status_code = status_code
+        self.checked_at = checked_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, ttl):
+        return time.time() - self.checked_at < ttl
+
+
+class LinkStatusCache:
+    """
+    On-disk SQLite cache of URL check results keyed by normalized URL,
+    with a time-to-live and least-recently-used eviction. Every write is its own
+    short transaction, so worker processes sharing the file do not lock each other out.
+    """
+
+    TOUCH_EVERY = 500  # Lookups remembered in memory before their last_used times are written
+
+    def __init__(self, path=None, ttl=None, max_entries=None, keep_open=False):
+        """
+        :param path: SQLite file path
+        :param ttl: Seconds a cached status is used without re-validation
+        :param max_entries: Maximum number of entries kept
+        :param keep_open: close() only commits, so the cache can be shared by many checkers
+        """
+        self.path = path or Config.LINK_CACHE_PATH
+        self.ttl = Config.LINK_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.LINK_CACHE_MAX_ENTRIES
+        self.keep_open = keep_open
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Normalized URL -> time of its last lookup, not yet written
+        self._touched = {}
+        # Threads of one process share the connection; worker processes share
+        # the file and wait for each other's short write transactions
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS link_status (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_link_status_last_used ON link_status (last_used)")
+        self._conn.commit()
+
+    def get(self, url):
+        """
+        Look up a URL and mark it as recently used.
+
+        :param url: URL to look up
+        :return: CachedLink, fresh or stale, or None if the URL was never cached
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, checked_at, etag, last_modified FROM link_status WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.TOUCH_EVERY:
+                self._write_touched()
+        return CachedLink(key, *row)
+
+    def put(self, url, status_code, etag=None, last_modified=None):
+        """
+        Store the result of a check.
+
+        :param url: Checked URL
+        :param status_code: HTTP status code received
+        :param etag: ETag response header, if any
+        :param last_modified: Last-Modified response header, if any
+        """
+        now = time.time()
+        key = normalize_url(url)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO link_status VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status_code, now, now, etag, last_modified),
+            )
+            self._touched.pop(key, None)
+
+    def _write_touched(self):
+        # Caller holds self._lock
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        with self._conn:
+            self._conn.executemany("UPDATE link_status SET last_used = ? WHERE url = ?",
+                                   [(used, key) for key, used in touched.items()])
+
+    def evict(self):
+        """
+        Remove least recently used entries above max_entries.
+
+        :return: Number of entries removed
+        """
+        with self._lock:
+            self._write_touched()
+            count = self._conn.execute("SELECT COUNT(*) FROM link_status").fetchone()[0]
+            excess = count - self.max_entries
+            if excess <= 0:
+                return 0
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM link_status WHERE url IN "
+                    "(SELECT url FROM link_status ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+            return excess
+
+    def close(self):
+        if self.keep_open:
+            with self._lock:
+                self._write_touched()
+            return
+        try:
+            self.evict()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+
+def open_link_cache():
+    """
+    Open the link status cache configured in Config.
+
+    :return: LinkStatusCache, or None if caching is disabled
+    """
+    global _shared_cache
+    if not Config.LINK_CACHE_ENABLED:
+        return None
+    if not Config.LINK_CACHE_KEEP_OPEN:
+        return LinkStatusCache()
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LinkStatusCache(keep_open=True)
+        return _shared_cache
+
+
+def close_shared_link_cache():
+    """
+    Close the cache kept open with Config.LINK_CACHE_KEEP_OPEN, e.g. when a service stops.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is not None:
+            _shared_cache.keep_open = False
+            _shared_cache.close()
+            _shared_cache = None
@@ -0,0 +1,197 @@
+import sqlite3
+import threading
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from config.config import Config
+from utils.deadline import DeadlineExceeded, current_deadline
+from utils.link_status import LinkStatus
+from utils.profiler import PROFILER
+
+# Statuses servers use when they refuse HEAD but may serve GET
+HEAD_REJECTED_STATUSES = {400, 403, 405, 501}
+
+# Limits shared by every LinkChecker of this process, keyed by (max_workers, per_host_limit)
+_shared_limits = {}
+_shared_limits_lock = threading.Lock()
+
+
+class _ConnectionLimits:
+    """
+    One pooled keep-alive session with a global and a per-host concurrency limit,
+    shared by all checkers of a process so concurrent pages stay within the limits together
+    and reuse each other's connections.
+    """
+
+    def __init__(self, max_workers, per_host_limit):
+        # requests is imported on first use, so browser-only runs do not load it
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # One connection pool per host, sized to the per-host limit so
+        # every in-flight check can reuse a kept-alive connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host_limit)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.per_host_limit = per_host_limit
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    @contextmanager
+    def slot(self, url, deadline):
+        """
+        Hold a slot of the URL's host and a global slot while a check is in flight.
+
+        :raises DeadlineExceeded: If the deadline passes while waiting for a slot
+        """
+        # The host slot is taken first, so checks queued on a busy host do not hold global slots
+        with ExitStack() as stack:
+            for semaphore in (self._host_slot(url), self._slots):
+                if not semaphore.acquire(timeout=deadline.remaining()):
+                    deadline.check()
+                    raise DeadlineExceeded(f"No free link check slot for {url}")
+                stack.callback(semaphore.release)
+            yield
+
+    def close(self):
+        self.session.close()
+
+
+def _get_limits(max_workers, per_host_limit):
+    with _shared_limits_lock:
+        key = (max_workers, per_host_limit)
+        if key not in _shared_limits:
+            _shared_limits[key] = _ConnectionLimits(max_workers, per_host_limit)
+        return _shared_limits[key]
+
+
+def close_shared_link_sessions():
+    """
+    Close the sessions shared by the link checkers of this process, e.g. when a service stops.
+    """
+    with _shared_limits_lock:
+        for limits in _shared_limits.values():
+            limits.close()
+        _shared_limits.clear()
+
+
+class LinkChecker:
+    """
+    Concurrent URL status checker. All checkers of a process with the same limits share
+    one pooled keep-alive session, a global concurrency limit and a per-host concurrency
+    limit, so pages checked at the same time do not multiply them.
+    With a cache, only stale or unseen URLs go to the network. Checks still waiting
+    when the deadline passes are cancelled instead of sent.
+    """
+
+    def __init__(self, max_workers=None, per_host_limit=None, timeout=None, cache=None, deadline=None):
+        """
+        :param max_workers: Maximum number of checks in flight across all hosts and checkers
+        :param per_host_limit: Maximum number of checks in flight per host across all checkers
+        :param timeout: Timeout in seconds for each request
+        :param cache: LinkStatusCache to read and update; it is closed with the checker
+        :param deadline: Deadline for all checks; the current deadline of the creating thread if not given
+        """
+        self.max_workers = max_workers or Config.LINK_CHECK_MAX_WORKERS
+        self.per_host_limit = per_host_limit or Config.LINK_CHECK_PER_HOST
+        self.timeout = timeout or Config.LINK_CHECK_TIMEOUT
+        self.cache = cache
+        self.deadline = deadline or current_deadline()
+        self._limits = _get_limits(self.max_workers, self.per_host_limit)
+        self.session = self._limits.session
+
+    def _request(self, url, headers):
+        response = self.session.head(url, headers=headers, timeout=self.deadline.timeout(self.timeout),
+                                     allow_redirects=True)
+        if response.status_code in HEAD_REJECTED_STATUSES:
+            # stream=True so only the headers are read before closing
+            with self.session.get(url, headers=headers, timeout=self.deadline.timeout(self.timeout),
+                                  allow_redirects=True, stream=True) as response:
+                pass
+        return response
+
+    def check(self, url):
+        """
+        Check a single URL, falling back from HEAD to GET when HEAD is rejected.
+        Fresh cached results are returned without a request; stale ones are
+        re-validated with If-None-Match/If-Modified-Since when possible.
+
+        :param url: URL to check
+        :return: LinkStatus; timed_out if the deadline passed before the check finished
+        """
+        cached = self._cache_get(url)
+        if cached is not None and cached.is_fresh(self.cache.ttl):
+            return LinkStatus(url, status_code=cached.status_code, from_cache=True)
+
+        headers = {}
+        if cached is not None and cached.status_code < 400:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        from requests import RequestException
+
+        try:
+            with self._limits.slot(url, self.deadline), PROFILER.phase('link_check'):
+                response = self._request(url, headers)
+        except (RequestException, DeadlineExceeded) as e:
+            # Network errors are usually transient, so they are not cached
+            return LinkStatus(url, error=type(e).__name__, timed_out=self.deadline.expired)
+
+        status_code = response.status_code
+        if status_code == 304 and headers:
+            status_code = cached.status_code
+        if self.cache is not None:
+            try:
+                self.cache.put(url, status_code,
+                               etag=response.headers.get('ETag') or (cached.etag if cached else None),
+                               last_modified=response.headers.get('Last-Modified') or (cached.last_modified if cached else None))
+            except sqlite3.OperationalError as e:
+                # The result is still valid; it just is not cached this time
+                print(f"Link cache not updated for {url}: {e}")
+        return LinkStatus(url, status_code=status_code)
+
+    def _cache_get(self, url):
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(url)
+        except sqlite3.OperationalError as e:
+            # A locked or unreadable cache only costs a request
+            print(f"Link cache not available for {url}: {e}")
+            return None
+
+    def check_all(self, urls):
+        """
+        Check many URLs concurrently.
+
+        :param urls: Iterable of URLs
+        :return: Dictionary mapping each URL to its LinkStatus
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(PROFILER.wrap(self.check), urls)))
+
+    def close(self):
+        # The shared session stays open for the next checker
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
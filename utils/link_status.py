@@ -0,0 +1,24 @@
+class LinkStatus:
+    """
+    Result of checking one URL. status_code is None when no response was received.
+    timed_out is True when the check was cancelled at the checker's deadline.
+    """
+
+    def __init__(self, url, status_code=None, error=None, from_cache=False, timed_out=False):
+        self.url = url
+        self.status_code = status_code
+        self.error = error
+        self.from_cache = from_cache
+        self.timed_out = timed_out
+
+    @property
+    def is_broken(self):
+        return self.status_code is None or self.status_code >= 400
+
+    def describe(self):
+        """
+        Short human-readable status for report comments.
+        """
+        if self.status_code is None:
+            return f"error: {self.error}"
+        return f"status {self.status_code}"
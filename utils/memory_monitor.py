@@ -0,0 +1,218 @@
+import csv
+import os
+import threading
+import time
+import tracemalloc
+from config.config import Config
+
+try:
+    import psutil
+    _MEASURE_ERRORS = (OSError, ValueError, psutil.Error)
+except ImportError:
+    psutil = None
+    _MEASURE_ERRORS = (OSError, ValueError)
+
+TIMELINE_COLUMNS = ['time', 'worker_pid', 'page_url', 'browser_pid', 'session_pages',
+                    'browser_rss_mb', 'python_rss_mb', 'python_traced_mb', 'python_traced_peak_mb']
+
+MB = 1024 * 1024
+
+
+def _proc_rss(pid):
+    # Resident set size from /proc, for Linux without psutil
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _proc_children():
+    # Parent pid -> child pids of every process, read from /proc
+    children = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                # The command name may contain spaces; fields after it are fixed
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def process_tree_rss(pid, include_children=True):
+    """
+    Resident memory of a process and, optionally, all its descendants, such as
+    chromedriver and the Chrome processes it started.
+
+    :param pid: Process id
+    :param include_children: Add the memory of all descendant processes
+    :return: Bytes, or None if memory cannot be read on this system (install psutil)
+    """
+    try:
+        if psutil is not None:
+            process = psutil.Process(pid)
+            processes = [process] + (process.children(recursive=True) if include_children else [])
+            total = 0
+            for item in processes:
+                try:
+                    total += item.memory_info().rss
+                except psutil.Error:
+                    pass  # Exited while being measured
+            return total
+        if not os.path.isdir('/proc'):
+            return None
+        total = _proc_rss(pid)
+        if include_children:
+            children = _proc_children()
+            descendants = list(children.get(pid, []))
+            for child in descendants:
+                descendants.extend(children.get(child, []))
+                try:
+                    total += _proc_rss(child)
+                except (OSError, IndexError, ValueError):
+                    pass  # Exited while being measured
+        return total
+    except _MEASURE_ERRORS:
+        # The process is gone or not readable
+        return None
+
+
+def browser_pid(driver):
+    """
+    Process id of the chromedriver behind a WebDriver session; Chrome runs as its descendants.
+
+    :return: Process id, or None if unknown
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return getattr(process, 'pid', None)
+
+
+def recycle_reason(driver):
+    """
+    Why a browser session should be restarted before its next page, if it should.
+
+    :param driver: Selenium WebDriver released after a page
+    :return: Reason text, or None to keep the session
+    """
+    pages = getattr(driver, 'session_pages', 0)
+    if Config.DRIVER_MAX_PAGES and pages >= Config.DRIVER_MAX_PAGES:
+        return f"{pages} pages"
+    memory_mb = getattr(driver, 'browser_rss_mb', None)
+    if Config.DRIVER_MAX_MEMORY_MB and memory_mb is not None and memory_mb >= Config.DRIVER_MAX_MEMORY_MB:
+        return f"{memory_mb:.0f} MB"
+    return None
+
+
+class MemoryMonitor:
+    """
+    Samples the memory of the browser process tree and of this Python process after
+    every page. Samples can be shipped between processes and exported as a CSV timeline.
+    """
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        # Samples are also needed to recycle browsers by memory, even without a timeline
+        return Config.MEMORY_MONITOR_ENABLED or bool(Config.DRIVER_MAX_MEMORY_MB)
+
+    def sample(self, driver, page_url):
+        """
+        Measure memory after a page and remember the browser's on the driver,
+        where the driver pool reads it to decide on recycling.
+
+        :param driver: Selenium WebDriver the page ran on, or None without a browser
+        :param page_url: URL of the page
+        :return: Sample dictionary, or None if monitoring is off
+        """
+        if not self.active:
+            return None
+        pid = browser_pid(driver) if driver is not None else None
+        browser_rss = process_tree_rss(pid) if pid is not None else None
+        if driver is not None:
+            driver.browser_rss_mb = None if browser_rss is None else browser_rss / MB
+        if not Config.MEMORY_MONITOR_ENABLED:
+            return None
+
+        python_rss = process_tree_rss(os.getpid(), include_children=False)
+        traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+        sample = {
+            'time': time.time(),
+            'worker_pid': os.getpid(),
+            'page_url': page_url,
+            'browser_pid': pid,
+            # The page being sampled is counted when the session is released
+            'session_pages': getattr(driver, 'session_pages', 0) + 1 if driver is not None else None,
+            'browser_rss_mb': _round_mb(browser_rss),
+            'python_rss_mb': _round_mb(python_rss),
+            'python_traced_mb': _round_mb(traced),
+            'python_traced_peak_mb': _round_mb(traced_peak),
+        }
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def drain(self):
+        """
+        Remove and return all samples, e.g. to send them from a worker process to the parent.
+        """
+        with self._lock:
+            samples, self.samples = self.samples, []
+        return samples
+
+    def extend(self, samples):
+        """
+        Add samples recorded in another process.
+        """
+        with self._lock:
+            self.samples.extend(samples)
+
+    def print_summary(self):
+        with self._lock:
+            samples = sorted(self.samples, key=lambda s: s['time'])
+        if not samples:
+            return
+        browser = [s['browser_rss_mb'] for s in samples if s['browser_rss_mb'] is not None]
+        python = [s['python_rss_mb'] for s in samples if s['python_rss_mb'] is not None]
+        print(f"\nMemory over {len(samples)} page(s):")
+        if browser:
+            print(f"  Browser: first {browser[0]:.0f} MB, last {browser[-1]:.0f} MB, max {max(browser):.0f} MB")
+        if python:
+            print(f"  Python:  first {python[0]:.0f} MB, last {python[-1]:.0f} MB, max {max(python):.0f} MB")
+
+    def write_timeline(self, path):
+        """
+        Write the samples as CSV, one row per page in the order they were measured.
+
+        :param path: Output file path
+        """
+        with self._lock:
+            samples = sorted(self.samples, key=lambda s: s['time'])
+        if not samples:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=TIMELINE_COLUMNS)
+            writer.writeheader()
+            writer.writerows(samples)
+        print(f"Memory timeline written: {path}")
+
+
+def _round_mb(value):
+    return None if value is None else round(value / MB, 1)
+
+
+def start_tracemalloc():
+    """
+    Start tracing Python allocations if Config.MEMORY_TRACEMALLOC is set.
+    """
+    if Config.MEMORY_MONITOR_ENABLED and Config.MEMORY_TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+MEMORY = MemoryMonitor()
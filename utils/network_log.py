@@ -0,0 +1,79 @@
+import json
+from config.config import Config
+from utils.link_status import LinkStatus
+
+# Chrome capability that records DevTools Network events in the 'performance' log
+PERFORMANCE_LOGGING_PREFS = {'performance': 'ALL'}
+
+
+class ResourceStatus(LinkStatus):
+    """
+    Response status of a subresource (image, script, stylesheet...) the browser
+    fetched while loading the page.
+    """
+
+    def __init__(self, url, resource_type, status_code=None, error=None):
+        super().__init__(url, status_code, error)
+        self.resource_type = resource_type
+
+
+def enable_network_log(chrome_options):
+    """
+    Make Chrome record DevTools Network events, read back with read_resource_statuses.
+
+    :param chrome_options: Chrome Options of a browser about to start
+    """
+    chrome_options.set_capability('goog:loggingPrefs', PERFORMANCE_LOGGING_PREFS)
+
+
+def clear_network_log(driver):
+    """
+    Drop the events recorded so far, e.g. those of the previous page.
+    """
+    if getattr(driver, 'network_log_enabled', False):
+        driver.get_log('performance')
+
+
+def read_resource_statuses(driver):
+    """
+    Collect the status of every subresource the browser fetched since the log was last read.
+    Resources blocked by the load profile, cancelled or still in flight are left out.
+
+    :param driver: Selenium WebDriver started with enable_network_log
+    :return: Dictionary mapping URL to ResourceStatus, or None if the driver does not record the log
+    """
+    if not getattr(driver, 'network_log_enabled', False):
+        return None
+
+    requests = {}  # request id -> [url, resource type, status code, error]
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        method = message.get('method')
+        params = message.get('params', {})
+        request_id = params.get('requestId')
+
+        if method == 'Network.requestWillBeSent':
+            # A redirect reuses the request id; keep the URL the page referenced
+            if request_id not in requests:
+                requests[request_id] = [params['request']['url'], params.get('type'), None, None]
+        elif method == 'Network.responseReceived' and request_id in requests:
+            requests[request_id][1] = params.get('type') or requests[request_id][1]
+            requests[request_id][2] = params['response']['status']
+        elif method == 'Network.loadingFailed' and request_id in requests:
+            if params.get('blockedReason') or params.get('canceled'):
+                # Blocked on purpose by the load profile, or aborted by the page
+                del requests[request_id]
+            else:
+                requests[request_id][3] = params.get('errorText') or 'loading failed'
+
+    statuses = {}
+    for url, resource_type, status_code, error in requests.values():
+        if resource_type not in Config.NETWORK_LOG_RESOURCE_TYPES or not url.startswith('http'):
+            continue
+        if status_code is None and error is None:
+            continue
+        status = ResourceStatus(url, resource_type, status_code, error if status_code is None else None)
+        # A URL loaded more than once is reported broken if any load failed
+        if url not in statuses or status.is_broken:
+            statuses[url] = status
+    return statuses
@@ -0,0 +1,122 @@
+import json
+import os
+import zipfile
+from utils.network_log import ResourceStatus
+from utils.page_snapshot import PageSnapshot
+
+INDEX_NAME = 'index.json'
+
+
+def snapshot_to_record(snapshot):
+    """
+    Plain dictionary of everything the checks read from a snapshot, for the archive.
+    Subresources are kept as their response statuses; bodies are not needed by any check.
+    """
+    resources = None
+    if snapshot.resources is not None:
+        resources = [{'url': status.url, 'type': status.resource_type,
+                      'status_code': status.status_code, 'error': status.error}
+                     for status in snapshot.resources.values()]
+    return {
+        'url': snapshot.url,
+        'html': snapshot.html,
+        'headings': snapshot.headings,
+        'images': snapshot.images,
+        'links': snapshot.links,
+        'scripts': snapshot.scripts,
+        'resources': resources,
+    }
+
+
+def snapshot_from_record(record):
+    """
+    Rebuild a PageSnapshot from an archived record.
+    """
+    resources = None
+    if record.get('resources') is not None:
+        resources = {item['url']: ResourceStatus(item['url'], item['type'], item['status_code'], item['error'])
+                     for item in record['resources']}
+    return PageSnapshot(record['url'], record['html'], record['headings'], record['images'],
+                        record['links'], record['scripts'], resources=resources)
+
+
+class PageArchiveWriter:
+    """
+    Writes the snapshots of a run to one compressed zip archive: one JSON entry per page
+    and an index mapping each requested URL to its entry. The archive appears under its
+    final name only once it is complete.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Archive path; an existing archive is replaced when this one is closed
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._temp_path = f"{path}.tmp"
+        self._zip = zipfile.ZipFile(self._temp_path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        self._index = {}
+
+    def add(self, url, record):
+        """
+        Store the snapshot record of one page.
+
+        :param url: URL the page was requested with, the key used on replay
+        :param record: Dictionary from snapshot_to_record
+        """
+        name = f"pages/{len(self._index):07d}.json"
+        self._zip.writestr(name, json.dumps(record, separators=(',', ':')))
+        self._index[url] = name
+
+    def close(self):
+        if self._zip.fp is None:
+            return
+        self._zip.writestr(INDEX_NAME, json.dumps(self._index))
+        self._zip.close()
+        os.replace(self._temp_path, self.path)
+        print(f"Archived {len(self._index)} page(s): {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PageArchive:
+    """
+    Read access to a recorded archive, for replaying the snapshot checks
+    without a browser or network.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._index = json.loads(self._zip.read(INDEX_NAME))
+
+    def urls(self):
+        """
+        Recorded page URLs in recording order.
+        """
+        return list(self._index)
+
+    def get(self, url):
+        """
+        :param url: URL the page was recorded for
+        :return: PageSnapshot
+        :raises KeyError: If the page is not in the archive
+        """
+        if url not in self._index:
+            raise KeyError(f"Page not in archive {self.path}: {url}")
+        return snapshot_from_record(json.loads(self._zip.read(self._index[url])))
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,302 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import repeat
+from multiprocessing.util import Finalize
+from config.config import Config
+from tests.registry import get_tests, SNAPSHOT, NETWORK, BROWSER
+from utils.deadline import Deadline, DeadlineExceeded, RESULT_GRACE, deadline_scope, is_timed_out, timed_out_result
+from utils.page_snapshot import capture_snapshot
+from utils.memory_monitor import MEMORY, start_tracemalloc
+from utils.page_state import open_page_state, page_fingerprint, mark_carried_forward
+from utils.profiler import PROFILER
+from utils.static_page import fetch_static_snapshot
+
+# Driver pool owned by the current worker process, started on first use
+_worker_pool = None
+
+# Thread pool shared by the network-bound tests of every page in this process
+_network_executor = None
+
+# Page state store of this process for incremental runs, opened on first use
+_page_state = None
+
+# Recorded archive replayed by this process, opened on first use
+_replay_archive = None
+
+# Snapshots captured for the record archive, waiting to be written by the main process
+_recorded = []
+
+
+def needs_browser(tests):
+    """
+    Whether Chrome has to be started for the engine and the given tests.
+    """
+    if Config.ENGINE == 'replay':
+        return False
+    specs = get_tests(tests)
+    if any(spec.needs == BROWSER for spec in specs):
+        return True
+    return Config.ENGINE == 'browser' and len(specs) > 0
+
+
+def _get_network_executor():
+    global _network_executor
+    if _network_executor is None:
+        _network_executor = ThreadPoolExecutor(max_workers=Config.NETWORK_TEST_WORKERS,
+                                               thread_name_prefix='network-test')
+    return _network_executor
+
+
+def _get_page_state():
+    global _page_state
+    if _page_state is None:
+        _page_state = open_page_state()
+    return _page_state
+
+
+def close_page_state():
+    """
+    Close the page state store of this process, if it was opened.
+    """
+    global _page_state
+    if _page_state is not None:
+        _page_state.close()
+        _page_state = None
+
+
+def _get_replay_archive():
+    global _replay_archive
+    if _replay_archive is None:
+        from utils.page_archive import PageArchive
+        _replay_archive = PageArchive(Config.REPLAY_ARCHIVE)
+    return _replay_archive
+
+
+def _drain_recorded():
+    records = list(_recorded)
+    _recorded.clear()
+    return records
+
+
+def _test_deadline(spec, page_deadline):
+    # Each test gets its own budget within what is left of the page's
+    return page_deadline.child(Config.TEST_DEADLINES.get(spec.name), spec.name)
+
+
+def _run_spec(spec, driver, url, snapshot, deadline):
+    with deadline_scope(deadline), PROFILER.context(test=spec.name), PROFILER.phase(f'test:{spec.name}'):
+        try:
+            deadline.check()
+            return spec.run(driver, url, snapshot)
+        except DeadlineExceeded as e:
+            return [timed_out_result(url, spec.name, e)]
+
+
+def run_page(driver, url, tests):
+    """
+    Run the given tests against one page. The page is loaded once and its
+    snapshot is shared by all snapshot and network tests. Network tests run
+    in a thread pool while the other tests use the snapshot and the browser.
+    Loading and testing the page share a Config.PAGE_DEADLINE budget; work past
+    it is cancelled and reported as timed out. Memory is sampled after the page.
+
+    :param driver: Selenium WebDriver, or None if no browser is needed
+    :param url: URL of the page to test
+    :param tests: Names of the tests to run
+    :return: Dictionary mapping report sheet name to the list of test results
+    """
+    deadline = Deadline(Config.PAGE_DEADLINE, 'page')
+    with PROFILER.context(page=url), deadline_scope(deadline):
+        results = _run_page(driver, url, get_tests(tests), deadline)
+    MEMORY.sample(driver, url)
+    return results
+
+
+def _apply_load_profile(driver, profile_name):
+    # Selenium is only imported when a browser is used
+    from drivers.chrome_driver import apply_load_profile
+    apply_load_profile(driver, profile_name)
+
+
+def _run_page(driver, url, specs, deadline):
+    results = {}
+    snapshot = None
+    if Config.ENGINE == 'replay':
+        # Replays have neither a browser nor network access
+        specs = [spec for spec in specs if spec.needs == SNAPSHOT]
+
+    if any(spec.needs != BROWSER for spec in specs):
+        try:
+            # Load the page once; snapshot and network tests share this snapshot
+            if Config.ENGINE == 'replay':
+                snapshot = _get_replay_archive().get(url)
+            elif Config.ENGINE == 'static':
+                snapshot = fetch_static_snapshot(url)
+            else:
+                _apply_load_profile(driver, Config.LOAD_PROFILE)
+                snapshot = capture_snapshot(driver, url)
+        except DeadlineExceeded as e:
+            print(f"Timed out loading {url}: {e}")
+            results.update(_page_error(url, f'Timed out: {str(e)}'))
+        except Exception as e:
+            print(f"Failed to load {url}: {e}")
+            results.update(_page_error(url, f'Page load failed: {str(e)}'))
+
+    if snapshot is not None and Config.RECORD_ARCHIVE and Config.ENGINE != 'replay':
+        from utils.page_archive import snapshot_to_record
+        _recorded.append((url, snapshot_to_record(snapshot)))
+
+    # Start network-bound tests first so they overlap with everything else
+    futures = {}
+    if snapshot is not None:
+        for spec in specs:
+            if spec.needs == NETWORK:
+                futures[spec.name] = _get_network_executor().submit(
+                    PROFILER.wrap(_run_spec), spec, None, url, snapshot, _test_deadline(spec, deadline))
+
+    # Snapshot test results of a page whose SEO facts are unchanged are carried forward;
+    # replays exist to re-evaluate the checks themselves, so they always run them
+    state = _get_page_state() if snapshot is not None and Config.ENGINE != 'replay' else None
+    carried = {}
+    if state is not None:
+        fingerprint = page_fingerprint(snapshot)
+        carried = state.get(url, fingerprint, [spec.name for spec in specs if spec.needs == SNAPSHOT])
+        if carried:
+            print(f"Unchanged page, carrying forward {len(carried)} result(s): {url}")
+
+    by_name = {}
+    fresh = {}
+    for spec in specs:
+        if spec.needs == SNAPSHOT and snapshot is not None:
+            if spec.name in carried:
+                by_name[spec.name] = mark_carried_forward(carried[spec.name], True)
+            elif state is not None:
+                test_deadline = _test_deadline(spec, deadline)
+                test_results = _run_spec(spec, driver, url, snapshot, test_deadline)
+                if not test_deadline.expired and not any(is_timed_out(row) for row in test_results):
+                    # Results cut short by the page's or the test's deadline are not carried forward
+                    fresh[spec.name] = test_results
+                by_name[spec.name] = mark_carried_forward(test_results, False)
+            else:
+                by_name[spec.name] = _run_spec(spec, driver, url, snapshot, _test_deadline(spec, deadline))
+        elif spec.needs == BROWSER:
+            _apply_load_profile(driver, Config.TEST_LOAD_PROFILES.get(spec.name, Config.LOAD_PROFILE))
+            by_name[spec.name] = _run_spec(spec, driver, url, snapshot, _test_deadline(spec, deadline))
+
+    if fresh:
+        state.put(url, fingerprint, fresh)
+
+    for name, future in futures.items():
+        remaining = deadline.remaining()
+        try:
+            by_name[name] = future.result(timeout=None if remaining is None else remaining + RESULT_GRACE)
+        except FutureTimeoutError:
+            # Abandon the test; its remaining waits and requests stop at the deadline
+            future.cancel()
+            by_name[name] = [timed_out_result(url, name, f"page exceeded its {deadline.seconds:g}s budget")]
+
+    # Keep the configured test order in the report
+    for spec in specs:
+        if spec.name in by_name:
+            results[spec.report_name] = by_name[spec.name]
+    return results
+
+
+def _page_error(url, message):
+    return {'page_load_errors': [{
+        'page_url': url,
+        'testcase': 'Page Load',
+        'passed': False,
+        'comments': message
+    }]}
+
+
+def run_page_with_pool(pool, url, tests):
+    """
+    Run the given tests against one page on a pooled browser session,
+    retrying on a new session if the browser crashes.
+
+    :param pool: DriverPool, or None if no browser is needed
+    :param url: URL of the page to test
+    :param tests: Names of the tests to run
+    :return: Dictionary mapping report sheet name to the list of test results
+    """
+    if pool is None:
+        return run_page(None, url, tests)
+    try:
+        return pool.run(run_page, url, tests)
+    except Exception as e:
+        print(f"Browser failed on {url}: {e}")
+        return _page_error(url, f'Browser failed: {str(e)}')
+
+
+def _init_worker(config_values):
+    # Apply the parent's configuration, which spawned workers would not inherit
+    for name, value in config_values.items():
+        setattr(Config, name, value)
+    start_tracemalloc()
+
+
+def _run_page_in_worker(url, tests):
+    global _worker_pool
+    if _worker_pool is None and needs_browser(tests):
+        from drivers.driver_pool import DriverPool
+        _worker_pool = DriverPool()
+        # Quit the browsers when the worker process exits
+        Finalize(None, _worker_pool.close, exitpriority=10)
+    if _page_state is None and _get_page_state() is not None:
+        Finalize(None, close_page_state, exitpriority=10)
+    # Timings, memory samples and recorded snapshots of this process travel back with the results
+    return run_page_with_pool(_worker_pool, url, tests), PROFILER.drain(), MEMORY.drain(), _drain_recorded()
+
+
+def run_pages(urls, tests, workers=None):
+    """
+    Run the given tests against many pages, spread across worker processes
+    that each own a pool of warm WebDriver sessions.
+
+    :param urls: URLs of the pages to test
+    :param tests: Names of the tests to run
+    :param workers: Number of worker processes; Config.WORKERS if not given
+    :return: Iterator over the results of each page, in page order, as dictionaries
+             mapping report sheet name to the list of test results
+    """
+    workers = min(workers or Config.WORKERS, len(urls))
+    archive = None
+    if Config.RECORD_ARCHIVE and Config.ENGINE != 'replay':
+        from utils.page_archive import PageArchiveWriter
+        archive = PageArchiveWriter(Config.RECORD_ARCHIVE)
+
+    try:
+        if workers <= 1:
+            start_tracemalloc()
+            pool = None
+            if needs_browser(tests):
+                from drivers.driver_pool import DriverPool
+                pool = DriverPool()
+            try:
+                for url in urls:
+                    page_results = run_page_with_pool(pool, url, tests)
+                    _archive_records(archive, _drain_recorded())
+                    yield page_results
+            finally:
+                if pool is not None:
+                    pool.close()
+                close_page_state()
+            return
+
+        config_values = {name: value for name, value in vars(Config).items() if name.isupper()}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config_values,)) as executor:
+            for page_results, events, samples, records in executor.map(_run_page_in_worker, urls, repeat(tests)):
+                PROFILER.extend(events)
+                MEMORY.extend(samples)
+                _archive_records(archive, records)
+                yield page_results
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def _archive_records(archive, records):
+    if archive is not None:
+        for url, record in records:
+            archive.add(url, record)
@@ -0,0 +1,86 @@
+from utils.network_log import clear_network_log, read_resource_statuses
+from utils.profiler import PROFILER
+
+
+class PageSnapshot:
+    """
+    Read-only copy of a rendered page, shared by every check that only
+    needs to inspect the DOM.
+    """
+
+    def __init__(self, url, html, headings, images, links, scripts, resources=None, blocked_resource_types=None):
+        """
+        :param url: URL the page was loaded from (after redirects)
+        :param html: Rendered page source
+        :param headings: List of heading tag names (h1-h6) in document order
+        :param images: List of dictionaries with 'src' and 'alt' of each <img>
+        :param links: List of href values of each <a>
+        :param scripts: List of inline <script> bodies in document order
+        :param resources: Dictionary mapping subresource URL to ResourceStatus from the
+                          browser's network log, or None if it was not recorded
+        :param blocked_resource_types: Resource types the browser's load profile kept from loading,
+                                       such as 'image'; they are missing from resources
+        """
+        self.url = url
+        self.html = html
+        self.headings = headings
+        self.images = images
+        self.links = links
+        self.scripts = scripts
+        self.resources = resources
+        self.blocked_resource_types = blocked_resource_types or []
+
+
+# Collects everything the read-only checks need in a single WebDriver round-trip
+EXTRACT_PAGE_DATA_JS = """
+var pick = function (selector, fn) {
+    return Array.prototype.map.call(document.querySelectorAll(selector), fn);
+};
+var url = function (el, name) {
+    // Resolved URL like get_attribute(); SVG elements expose an object instead
+    return typeof el[name] === 'string' ? el[name] : el.getAttribute(name);
+};
+return {
+    url: window.location.href,
+    html: document.documentElement.outerHTML,
+    headings: pick('h1, h2, h3, h4, h5, h6', function (el) { return el.tagName.toLowerCase(); }),
+    images: pick('img', function (el) { return {src: url(el, 'src'), alt: el.getAttribute('alt')}; }),
+    links: pick('a', function (el) { return url(el, 'href'); }),
+    scripts: pick('script:not([src])', function (el) { return el.innerHTML; })
+};
+"""
+
+
+def extract_page_data(driver):
+    """
+    Extract page URL, HTML, headings, images, links and inline scripts
+    with one execute_script call, regardless of element count.
+
+    :param driver: Selenium WebDriver with the page loaded
+    :return: Dictionary of plain Python structures, keyed like PageSnapshot attributes
+    """
+    return driver.execute_script(EXTRACT_PAGE_DATA_JS)
+
+
+def capture_snapshot(driver, url):
+    """
+    Load a page once in the browser and capture everything the read-only checks need,
+    including the statuses of the subresources it loaded when the network log is on.
+
+    :param driver: Selenium WebDriver
+    :param url: URL of the page to load
+    :return: PageSnapshot
+    :raises DeadlineExceeded: If the page did not load within the current deadline
+    """
+    # Selenium is only imported when a browser is used; the static engine shares PageSnapshot
+    from utils.web_utils import load_page, wait_for_element
+    from drivers.chrome_driver import LOAD_PROFILES
+
+    with PROFILER.phase('navigation'):
+        clear_network_log(driver)
+        load_page(driver, url)
+        wait_for_element(driver, 'h1')
+    page_data = extract_page_data(driver)
+    profile = LOAD_PROFILES.get(getattr(driver, 'load_profile', None), {})
+    return PageSnapshot(resources=read_resource_statuses(driver),
+                        blocked_resource_types=profile.get('block_resource_types'), **page_data)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from config.config import Config
+from utils.link_cache import normalize_url
+from utils.script_data import extract_script_data
+
+
+def page_fingerprint(snapshot):
+    """
+    Hash the SEO facts the snapshot checks read: headings, images and ScriptData.
+    Markup changes that don't touch these facts, such as nonces or reordered
+    attributes, keep the same fingerprint.
+
+    :param snapshot: PageSnapshot of the page
+    :return: Hex digest
+    """
+    facts = {
+        'headings': snapshot.headings,
+        'images': snapshot.images,
+        'script_data': extract_script_data(snapshot.scripts),
+        # Changing the exported columns must re-check every page
+        'script_data_fields': Config.SCRIPT_DATA_FIELDS,
+    }
+    return hashlib.sha256(json.dumps(facts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class PageStateStore:
+    """
+    SQLite store of the last snapshot test results of each page with the fingerprint
+    they were computed for, so results of unchanged pages can be carried forward.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        """
+        :param path: SQLite file path
+        :param ttl: Seconds stored results are reused before the page is checked again anyway
+        """
+        self.path = path or Config.PAGE_STATE_PATH
+        self.ttl = Config.PAGE_STATE_TTL if ttl is None else ttl
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Threads of one process share the connection; worker processes share
+        # the file, so wait for each other's writes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS page_results (
+                url TEXT NOT NULL,
+                test TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                results TEXT NOT NULL,
+                PRIMARY KEY (url, test)
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, url, fingerprint, tests):
+        """
+        Stored results of the given tests that were computed for this fingerprint.
+
+        :param url: Page URL
+        :param fingerprint: Current page_fingerprint of the page
+        :param tests: Test names
+        :return: Dictionary mapping test name to its list of results; tests without
+                 usable stored results are left out
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT test, fingerprint, checked_at, results FROM page_results WHERE url = ?",
+                (normalize_url(url),),
+            ).fetchall()
+        now = time.time()
+        return {
+            test: json.loads(results)
+            for test, stored_fingerprint, checked_at, results in rows
+            if test in tests and stored_fingerprint == fingerprint and now - checked_at < self.ttl
+        }
+
+    def put(self, url, fingerprint, results):
+        """
+        Store the results of a page in one transaction.
+
+        :param url: Page URL
+        :param fingerprint: page_fingerprint the results were computed for
+        :param results: Dictionary mapping test name to its list of results
+        """
+        now = time.time()
+        key = normalize_url(url)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO page_results VALUES (?, ?, ?, ?, ?)",
+                [(key, test, fingerprint, now, json.dumps(rows, default=str)) for test, rows in results.items()],
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def mark_carried_forward(test_results, carried_forward):
+    """
+    Add the carried_forward column to every result row.
+
+    :param test_results: List of result dictionaries
+    :param carried_forward: True if the results were reused from an earlier run
+    :return: New list of result dictionaries
+    """
+    return [{**row, 'carried_forward': carried_forward} for row in test_results]
+
+
+def open_page_state():
+    """
+    Open the page state store configured in Config.
+
+    :return: PageStateStore, or None if incremental runs are disabled
+    """
+    if not Config.INCREMENTAL_ENABLED:
+        return None
+    return PageStateStore()
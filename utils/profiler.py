@@ -0,0 +1,246 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from config.config import Config
+
+
+class Profiler:
+    """
+    Records timed phases of a run (driver startup, navigation, WebDriver commands,
+    link checks, report writing) attributed to the page and test they ran for.
+    The summary is aggregated as events arrive. With a trace open, events are
+    written to it straight away instead of being kept, so memory stays bounded
+    however long the run; otherwise they are kept until drained, e.g. to ship
+    them from a worker process to the parent.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Phase -> [count, total seconds, max seconds]
+        self._phases = {}
+        # (page, test) -> WebDriver commands
+        self._round_trips = defaultdict(int)
+        self._trace_file = None
+        self._trace_path = None
+        self._trace_pid = None
+        self._trace_events = 0
+
+    def current_context(self):
+        """
+        Page/test attribution of the current thread.
+        """
+        return dict(getattr(self._local, 'context', {}))
+
+    @contextmanager
+    def context(self, **attributes):
+        """
+        Attribute every phase inside the block to e.g. page=... and test=...
+        """
+        previous = self.current_context()
+        self._local.context = {**previous, **attributes}
+        try:
+            yield
+        finally:
+            self._local.context = previous
+
+    def wrap(self, fn):
+        """
+        Bind fn to the caller's context, for work handed to another thread.
+        """
+        context = self.current_context()
+
+        def wrapped(*args, **kwargs):
+            with self.context(**context):
+                return fn(*args, **kwargs)
+        return wrapped
+
+    @contextmanager
+    def phase(self, name, category='phase'):
+        """
+        Time the block as one event.
+
+        :param name: Phase name, e.g. 'navigation'
+        :param category: Event category; 'webdriver' for WebDriver commands
+        """
+        if not Config.PROFILE_ENABLED:
+            yield
+            return
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._add([{
+                'name': name,
+                'cat': category,
+                'ts': started_at,
+                'dur': duration,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': self.current_context(),
+            }])
+
+    def _add(self, events):
+        with self._lock:
+            for event in events:
+                name = 'webdriver' if event['cat'] == 'webdriver' else event['name']
+                stats = self._phases.get(name)
+                if stats is None:
+                    self._phases[name] = [1, event['dur'], event['dur']]
+                else:
+                    stats[0] += 1
+                    stats[1] += event['dur']
+                    stats[2] = max(stats[2], event['dur'])
+                if event['cat'] == 'webdriver':
+                    self._round_trips[(event['args'].get('page'), event['args'].get('test'))] += 1
+                # Forked worker processes inherit the open trace but ship their events to the parent
+                if self._trace_file is not None and self._trace_pid == os.getpid():
+                    self._write_trace_event(event)
+                else:
+                    self.events.append(event)
+
+    def timed(self, name, category='phase'):
+        """
+        Decorator that times every call of a function as a phase.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.phase(name, category):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def drain(self):
+        """
+        Remove and return the events kept since the last drain, e.g. to send them from a worker process.
+        """
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    def extend(self, events):
+        """
+        Add events recorded elsewhere, e.g. in a worker process.
+        """
+        self._add(events)
+
+    def summary(self):
+        """
+        Aggregate events per phase. WebDriver commands are grouped under 'webdriver'.
+
+        :return: List of dictionaries with phase, count, total_s, mean_ms and max_ms, slowest first
+        """
+        with self._lock:
+            phases = {name: list(stats) for name, stats in self._phases.items()}
+        rows = [{
+            'phase': name,
+            'count': count,
+            'total_s': round(total, 3),
+            'mean_ms': round(total / count * 1000, 1),
+            'max_ms': round(longest * 1000, 1),
+        } for name, (count, total, longest) in phases.items()]
+        return sorted(rows, key=lambda row: row['total_s'], reverse=True)
+
+    def webdriver_round_trips(self):
+        """
+        Count WebDriver commands per page and test.
+
+        :return: Dictionary mapping (page, test) to the number of commands
+        """
+        with self._lock:
+            return dict(self._round_trips)
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print(f"\n{'Phase':<30}{'Count':>8}{'Total s':>10}{'Mean ms':>10}{'Max ms':>10}")
+        for row in rows:
+            print(f"{row['phase']:<30}{row['count']:>8}{row['total_s']:>10}{row['mean_ms']:>10}{row['max_ms']:>10}")
+
+        round_trips = self.webdriver_round_trips()
+        if round_trips:
+            print(f"\n{'WebDriver round-trips':<24}{'Test':<28}Page")
+            for (page, test), count in sorted(round_trips.items(), key=lambda item: -item[1]):
+                print(f"{count:<24}{test or '-':<28}{page or '-'}")
+
+    def open_trace(self, path):
+        """
+        Stream every event from now on, and those kept so far, to a Chrome trace-event
+        JSON file, viewable in chrome://tracing or Perfetto. Finish it with write_trace.
+
+        :param path: Output file path
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._trace_file = open(path, 'w', encoding='utf-8')
+            self._trace_path = path
+            self._trace_pid = os.getpid()
+            self._trace_events = 0
+            self._trace_file.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+            for event in self.events:
+                self._write_trace_event(event)
+            self.events = []
+
+    def _write_trace_event(self, event):
+        # Caller holds self._lock
+        if self._trace_events:
+            self._trace_file.write(',\n')
+        self._trace_file.write(json.dumps({
+            'name': event['name'],
+            'cat': event['cat'],
+            'ph': 'X',
+            'ts': int(event['ts'] * 1000000),
+            'dur': int(event['dur'] * 1000000),
+            'pid': event['pid'],
+            'tid': event['tid'],
+            'args': event['args'],
+        }))
+        self._trace_events += 1
+
+    def write_trace(self, path):
+        """
+        Finish the trace opened with open_trace, or write the events kept so far
+        as Chrome trace-event JSON if none was opened.
+
+        :param path: Output file path if no trace was opened
+        """
+        if self._trace_file is None:
+            self.open_trace(path)
+        with self._lock:
+            self._trace_file.write('\n]}\n')
+            self._trace_file.close()
+            self._trace_file = None
+        print(f"Trace written: {self._trace_path}")
+
+
+# Profiler of the current process
+PROFILER = Profiler()
+
+
+def instrument_driver(driver):
+    """
+    Time every WebDriver command sent by this driver as a 'webdriver' event.
+    All Selenium calls go through WebDriver.execute, one HTTP round-trip each.
+
+    :param driver: Selenium WebDriver
+    :return: The same driver
+    """
+    execute = driver.execute
+
+    def timed_execute(driver_command, params=None):
+        with PROFILER.phase(driver_command, category='webdriver'):
+            return execute(driver_command, params)
+
+    driver.execute = timed_execute
+    return driver
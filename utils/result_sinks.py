@@ -0,0 +1,335 @@
+import atexit
+import csv
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import time
+from config.config import Config
+
+# Columns every result has, stored with their own type in Parquet; all others are stored as text
+PARQUET_COLUMN_TYPES = {'page_url': 'string', 'testcase': 'string', 'passed': 'bool_', 'carried_forward': 'bool_'}
+
+
+def _safe_name(sheet_name):
+    # Sheet names become part of file names
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', sheet_name)
+
+
+class ResultSink:
+    """
+    Destination that test results are streamed to as each check finishes.
+    Rows are buffered up to buffer_rows and flushed on close, including at interpreter exit.
+    """
+
+    def __init__(self, buffer_rows=None):
+        """
+        :param buffer_rows: Rows held in memory before they are flushed; Config.SINK_BUFFER_ROWS if not given
+        """
+        self.buffer_rows = buffer_rows or Config.SINK_BUFFER_ROWS
+        self._pending_rows = 0
+        self._closed = False
+        # Flush what was buffered even if the run dies with an unhandled error
+        atexit.register(self.close)
+
+    def write(self, test_results, sheet_name):
+        """
+        Append results of one test.
+
+        :param test_results: List of dictionaries containing test results
+        :param sheet_name: Report sheet the results belong to
+        """
+        for row in test_results:
+            self._write_row(row, sheet_name)
+            self._pending_rows += 1
+            if self._pending_rows >= self.buffer_rows:
+                self.flush()
+
+    def _write_row(self, row, sheet_name):
+        raise NotImplementedError
+
+    def flush(self):
+        self._pending_rows = 0
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # A flush that fails is not retried at exit
+        atexit.unregister(self.close)
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonlSink(ResultSink):
+    """
+    Writes all results to one JSON Lines file, one {"report": ..., "row": {...}} object per line.
+    """
+
+    def __init__(self, path, buffer_rows=None):
+        super().__init__(buffer_rows)
+        self.path = path
+        _make_parent_dir(path)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write_row(self, row, sheet_name):
+        self._file.write(json.dumps({'report': sheet_name, 'row': row}, default=str) + '\n')
+
+    def flush(self):
+        super().flush()
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._file.close()
+
+
+class CsvSink(ResultSink):
+    """
+    Writes one CSV file per report sheet. The columns of a sheet are the union of its
+    row keys, in first-seen order, like the Excel sheets; a column that shows up after
+    rows were written widens the file, leaving it empty in the earlier rows.
+    """
+
+    def __init__(self, directory, prefix, buffer_rows=None):
+        super().__init__(buffer_rows)
+        self.directory = directory
+        self.prefix = prefix
+        self._writers = {}  # sheet name -> (file, DictWriter)
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, sheet_name):
+        return os.path.join(self.directory, f"{self.prefix}_{_safe_name(sheet_name)}.csv")
+
+    def _write_row(self, row, sheet_name):
+        if sheet_name not in self._writers:
+            f = open(self.path_for(sheet_name), 'w', encoding='utf-8', newline='')
+            writer = csv.DictWriter(f, fieldnames=list(row))
+            writer.writeheader()
+            self._writers[sheet_name] = (f, writer)
+        elif any(column not in self._writers[sheet_name][1].fieldnames for column in row):
+            self._widen(sheet_name, row)
+        self._writers[sheet_name][1].writerow(row)
+
+    def _widen(self, sheet_name, row):
+        # Copy what was written under the wider header; this happens at most once per new column
+        f, writer = self._writers[sheet_name]
+        fieldnames = list(dict.fromkeys(list(writer.fieldnames) + list(row)))
+        f.close()
+        path = self.path_for(sheet_name)
+        temp_path = f"{path}.tmp"
+        with open(path, encoding='utf-8', newline='') as source, \
+                open(temp_path, 'w', encoding='utf-8', newline='') as target:
+            widened = csv.DictWriter(target, fieldnames=fieldnames)
+            widened.writeheader()
+            widened.writerows(csv.DictReader(source))
+        os.replace(temp_path, path)
+        f = open(path, 'a', encoding='utf-8', newline='')
+        self._writers[sheet_name] = (f, csv.DictWriter(f, fieldnames=fieldnames))
+
+    def flush(self):
+        super().flush()
+        for f, _ in self._writers.values():
+            if not f.closed:
+                f.flush()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for f, _ in self._writers.values():
+                f.close()
+
+
+class ParquetSink(ResultSink):
+    """
+    Writes one Parquet file per report sheet, one row group per flushed buffer.
+    page_url, testcase and passed keep their types; other columns are stored as text,
+    so values of mixed types, such as a missing ID reported as '', fit one schema.
+    Requires pyarrow.
+    """
+
+    def __init__(self, directory, prefix, buffer_rows=None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        super().__init__(buffer_rows)
+        self.directory = directory
+        self.prefix = prefix
+        self._buffers = {}  # sheet name -> list of rows
+        self._writers = {}  # sheet name -> ParquetWriter
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, sheet_name):
+        return os.path.join(self.directory, f"{self.prefix}_{_safe_name(sheet_name)}.parquet")
+
+    def _write_row(self, row, sheet_name):
+        self._buffers.setdefault(sheet_name, []).append(row)
+
+    def flush(self):
+        super().flush()
+        for sheet_name, rows in self._buffers.items():
+            if not rows:
+                continue
+            columns = list(dict.fromkeys(name for row in rows for name in row))
+            writer = self._writers.get(sheet_name)
+            if writer is None:
+                writer = self._open_writer(sheet_name, self._schema_for(columns))
+            elif any(writer.schema.get_field_index(name) < 0 for name in columns):
+                writer = self._widen(sheet_name, writer, columns)
+            table = self._pa.Table.from_pylist([self._parquet_row(row) for row in rows], schema=writer.schema)
+            writer.write_table(table)
+            rows.clear()
+
+    def _schema_for(self, columns):
+        return self._pa.schema([
+            (name, getattr(self._pa, PARQUET_COLUMN_TYPES.get(name, 'string'))()) for name in columns
+        ])
+
+    @staticmethod
+    def _parquet_row(row):
+        return {name: value if value is None or name in PARQUET_COLUMN_TYPES
+                else value if isinstance(value, str) else str(value)
+                for name, value in row.items()}
+
+    def _open_writer(self, sheet_name, schema):
+        writer = self._pq.ParquetWriter(self.path_for(sheet_name), schema)
+        self._writers[sheet_name] = writer
+        return writer
+
+    def _widen(self, sheet_name, writer, columns):
+        # A file's schema is fixed once written: rewrite what is there with the new columns
+        # added as empty. This happens at most once per column that shows up late.
+        writer.close()
+        written = self._pq.read_table(self.path_for(sheet_name))
+        schema = self._schema_for(list(dict.fromkeys(written.column_names + columns)))
+        for field in schema:
+            if written.schema.get_field_index(field.name) < 0:
+                written = written.append_column(field, self._pa.nulls(written.num_rows, field.type))
+        writer = self._open_writer(sheet_name, schema)
+        writer.write_table(written.select(schema.names))
+        return writer
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for writer in self._writers.values():
+                writer.close()
+
+
+class SqliteSink(ResultSink):
+    """
+    Writes all results to one SQLite file, e.g. the result store of one shard.
+    Rows are kept in arrival order with the page they belong to, so stores can be merged.
+    """
+
+    def __init__(self, path, buffer_rows=None, metadata=None):
+        """
+        :param path: SQLite file path; an existing store is replaced
+        :param metadata: Dictionary of strings stored with the results, e.g. the shard
+        """
+        super().__init__(buffer_rows)
+        self.path = path
+        self._rows = []
+        _make_parent_dir(path)
+        if os.path.exists(path):
+            os.remove(path)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE results (seq INTEGER PRIMARY KEY, report TEXT NOT NULL, page_url TEXT, row TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.executemany("INSERT INTO metadata VALUES (?, ?)",
+                               list({'created_at': str(time.time()), **(metadata or {})}.items()))
+        self._conn.commit()
+
+    def _write_row(self, row, sheet_name):
+        self._rows.append((sheet_name, row.get('page_url'), json.dumps(row, default=str)))
+
+    def flush(self):
+        super().flush()
+        if self._rows:
+            with self._conn:
+                self._conn.executemany("INSERT INTO results (report, page_url, row) VALUES (?, ?, ?)", self._rows)
+            self._rows.clear()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._conn.close()
+
+
+def _make_parent_dir(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def iter_jsonl_results(path):
+    """
+    Read back a JSON Lines result stream.
+
+    :param path: Path written by JsonlSink
+    :return: Iterator of (sheet name, row) tuples
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash
+                continue
+            yield record['report'], record['row']
+
+
+def _open_store(path):
+    # Read-only, so a mistyped path is not created as an empty database
+    if not os.path.isfile(path):
+        raise ValueError(f"No result store at {path}")
+    return sqlite3.connect(pathlib.Path(path).absolute().as_uri() + '?mode=ro', uri=True)
+
+
+def read_sqlite_metadata(path):
+    """
+    Read the metadata of a store written by SqliteSink.
+
+    :return: Dictionary of strings
+    :raises ValueError: If the file does not exist or is not a result store
+    """
+    conn = _open_store(path)
+    try:
+        return dict(conn.execute("SELECT key, value FROM metadata"))
+    except sqlite3.DatabaseError:
+        raise ValueError(f"Not a result store written by a sharded run: {path}")
+    finally:
+        conn.close()
+
+
+def iter_sqlite_results(path):
+    """
+    Read back a store written by SqliteSink.
+
+    :param path: Path written by SqliteSink
+    :return: Iterator of (sheet name, row) tuples in arrival order
+    """
+    conn = _open_store(path)
+    try:
+        for sheet_name, row in conn.execute("SELECT report, row FROM results ORDER BY seq"):
+            yield sheet_name, json.loads(row)
+    finally:
+        conn.close()
@@ -0,0 +1,373 @@
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from config.config import Config
+from utils.result_sinks import ResultSink
+
+# URLs in result comments, e.g. the broken link or the image src a failure is about
+DETAIL_URL_PATTERN = re.compile(r"(?:https?|data):[^\s,()'\"\[\]]+")
+
+# Relative run references: the latest run at least this old, e.g. '1d' for "since yesterday"
+AGE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)([mhd])$')
+AGE_UNITS = {'m': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+DIFF_STATUSES = ('new', 'resolved', 'persistent', 'not_rechecked')
+
+# Rows the history sink buffers per transaction; index inserts are much cheaper in large batches
+HISTORY_BUFFER_ROWS = 20000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    label TEXT,
+    rows INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    report TEXT NOT NULL,
+    page_url TEXT,
+    testcase TEXT,
+    detail TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    comments TEXT
+);
+-- Covers every diff lookup: the failures of a run in key order, with their report
+CREATE UNIQUE INDEX IF NOT EXISTS results_key ON results (run_id, passed, key, report);
+CREATE TABLE IF NOT EXISTS run_pages (
+    run_id INTEGER NOT NULL,
+    report TEXT NOT NULL,
+    page_url TEXT NOT NULL,
+    PRIMARY KEY (run_id, report, page_url)
+) WITHOUT ROWID;
+"""
+
+
+def result_details(row):
+    """
+    What a result is about beyond its page and test case: every URL in its comments,
+    such as the broken link or each image missing its alt text. One history entry is
+    stored per detail, so failures are compared item by item across runs.
+
+    :param row: Result dictionary
+    :return: List of details; [''] if the comments name no URL
+    """
+    details = DETAIL_URL_PATTERN.findall(str(row.get('comments') or ''))
+    return list(dict.fromkeys(details)) or ['']
+
+
+def result_key(report, page_url, testcase, detail):
+    """
+    64-bit key of one result, stable across runs. Comments are left out so that
+    e.g. a broken link whose status changes from 404 to 500 stays the same failure.
+    """
+    digest = hashlib.blake2b('\x1f'.join((report, page_url or '', testcase or '', detail)).encode('utf-8'),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class RunHistory:
+    """
+    SQLite store of the results of every run, keyed by run, report, page, test case and
+    detail, for comparing failures between runs. Rows are appended in arrival order and
+    diffs are index lookups on (run, key), so both stay fast with millions of stored results.
+    """
+
+    def __init__(self, path=None):
+        """
+        :param path: SQLite file path; Config.HISTORY_PATH if not given
+        """
+        self.path = path or Config.HISTORY_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Keep the key index of large runs in memory while inserting and diffing
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.executescript(SCHEMA)
+
+    def start_run(self, label=None):
+        """
+        :param label: Free text shown in the run list, e.g. the URL source
+        :return: Id of the new run
+        """
+        with self._conn:
+            cursor = self._conn.execute("INSERT INTO runs (started_at, label) VALUES (?, ?)", (time.time(), label))
+        return cursor.lastrowid
+
+    def add_results(self, run_id, entries):
+        """
+        Store results of a run in one transaction.
+
+        :param run_id: Run from start_run
+        :param entries: List of (report, row) tuples
+        """
+        records = []
+        pages = set()
+        for report, row in entries:
+            page_url = row.get('page_url')
+            passed = 0 if row.get('passed') is False else 1
+            for detail in result_details(row):
+                records.append((run_id, result_key(report, page_url, row.get('testcase'), detail), report,
+                                page_url, row.get('testcase'), detail, passed, row.get('comments')))
+            if page_url:
+                pages.add((run_id, report, page_url))
+        # Inserting in key order touches each index page once per batch
+        records.sort(key=lambda record: record[1])
+        with self._conn:
+            # A detail reported twice in a run is stored once per outcome; it counts as
+            # failed in the run if it failed once
+            self._conn.executemany("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", records)
+            self._conn.executemany("INSERT OR IGNORE INTO run_pages VALUES (?, ?, ?)", pages)
+
+    def finish_run(self, run_id):
+        """
+        Record the totals of a finished run and drop runs beyond Config.HISTORY_KEEP_RUNS.
+        """
+        with self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, "
+                "rows = (SELECT COUNT(*) FROM results WHERE run_id = ?), "
+                "failures = (SELECT COUNT(*) FROM results WHERE run_id = ? AND passed = 0) "
+                "WHERE run_id = ?",
+                (time.time(), run_id, run_id, run_id),
+            )
+        if Config.HISTORY_KEEP_RUNS:
+            self.prune(Config.HISTORY_KEEP_RUNS)
+
+    def prune(self, keep_runs):
+        """
+        Delete all but the newest keep_runs runs.
+        """
+        old = [run_id for (run_id,) in self._conn.execute(
+            "SELECT run_id FROM runs ORDER BY run_id DESC LIMIT -1 OFFSET ?", (keep_runs,))]
+        if not old:
+            return
+        with self._conn:
+            for table in ('results', 'run_pages', 'runs'):
+                self._conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(run_id,) for run_id in old])
+
+    def runs(self, limit=20):
+        """
+        Newest runs first.
+
+        :return: List of dictionaries with run_id, started_at, finished_at, label, rows and failures
+        """
+        cursor = self._conn.execute(
+            "SELECT run_id, started_at, finished_at, label, rows, failures FROM runs ORDER BY run_id DESC LIMIT ?",
+            (limit,))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, values)) for values in cursor]
+
+    def resolve_run(self, reference):
+        """
+        Find a run by reference.
+
+        :param reference: Run id, 'latest', 'previous', or an age such as '1d', '12h' or '30m'
+                          for the latest run started at least that long ago
+        :return: Run id
+        :raises ValueError: If no run matches
+        """
+        reference = str(reference).strip().lower()
+        if reference.isdigit():
+            row = self._conn.execute("SELECT run_id FROM runs WHERE run_id = ?", (int(reference),)).fetchone()
+        elif reference in ('latest', 'previous'):
+            offset = 0 if reference == 'latest' else 1
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NOT NULL ORDER BY run_id DESC LIMIT 1 OFFSET ?",
+                (offset,)).fetchone()
+        else:
+            match = AGE_PATTERN.match(reference)
+            if not match:
+                raise ValueError(f"Invalid run reference '{reference}'. Use a run id, 'latest', 'previous' or an age such as 1d")
+            started_before = time.time() - float(match.group(1)) * AGE_UNITS[match.group(2)]
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NOT NULL AND started_at <= ? "
+                "ORDER BY run_id DESC LIMIT 1", (started_before,)).fetchone()
+        if row is None:
+            raise ValueError(f"No run found for '{reference}' in {self.path}")
+        return row[0]
+
+    def _diff_query(self, status, report):
+        # old = run_a, new = run_b; every lookup of the other run is a seek on the results_key index
+        filter_sql = " AND {alias}.report = :report" if report else ""
+        failing_in_other = ("EXISTS (SELECT 1 FROM results o WHERE o.run_id = {other} "
+                            "AND o.passed = 0 AND o.key = {alias}.key)")
+        rechecked = ("EXISTS (SELECT 1 FROM run_pages p WHERE p.run_id = :run_b "
+                     "AND p.report = a.report AND p.page_url = a.page_url)")
+        if status == 'new':
+            where = f"NOT {failing_in_other.format(other=':run_a', alias='b')}"
+            alias = 'b'
+        elif status == 'persistent':
+            where = failing_in_other.format(other=':run_a', alias='b')
+            alias = 'b'
+        elif status == 'resolved':
+            where = f"NOT {failing_in_other.format(other=':run_b', alias='a')} AND {rechecked}"
+            alias = 'a'
+        else:
+            where = f"NOT {failing_in_other.format(other=':run_b', alias='a')} AND NOT {rechecked}"
+            alias = 'a'
+        run = ':run_b' if alias == 'b' else ':run_a'
+        return (f"FROM results {alias} WHERE {alias}.run_id = {run} AND {alias}.passed = 0 AND {where}"
+                + filter_sql.format(alias=alias)), alias
+
+    def diff_counts(self, run_a, run_b, report=None):
+        """
+        Count failures by how they changed from run_a to run_b.
+
+        :param run_a: Id of the earlier run
+        :param run_b: Id of the later run
+        :param report: Only compare this report sheet
+        :return: Dictionary mapping each of DIFF_STATUSES to a dictionary {report: count}
+        """
+        params = {'run_a': run_a, 'run_b': run_b, 'report': report}
+        counts = {}
+        for status in DIFF_STATUSES:
+            query, alias = self._diff_query(status, report)
+            counts[status] = dict(self._conn.execute(
+                f"SELECT {alias}.report, COUNT(*) {query} GROUP BY {alias}.report", params))
+        return counts
+
+    def iter_diff(self, run_a, run_b, status, report=None):
+        """
+        Stream the failures of one diff status, ordered by report, page and test case.
+
+        :param status: One of DIFF_STATUSES
+        :return: Iterator of dictionaries with report, page_url, testcase, detail and comments;
+                 comments come from run_b for new and persistent failures, else from run_a
+        """
+        query, alias = self._diff_query(status, report)
+        cursor = self._conn.execute(
+            f"SELECT {alias}.report, {alias}.page_url, {alias}.testcase, {alias}.detail, {alias}.comments {query} "
+            f"ORDER BY {alias}.report, {alias}.page_url, {alias}.testcase, {alias}.detail",
+            {'run_a': run_a, 'run_b': run_b, 'report': report})
+        for report_name, page_url, testcase, detail, comments in cursor:
+            yield {'report': report_name, 'page_url': page_url, 'testcase': testcase,
+                   'detail': detail, 'comments': comments}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class RunHistorySink(ResultSink):
+    """
+    Records the results of a run in the run history as they are streamed.
+    """
+
+    def __init__(self, path=None, label=None, buffer_rows=None):
+        """
+        :param path: SQLite file path; Config.HISTORY_PATH if not given
+        :param label: Free text shown in the run list
+        """
+        super().__init__(buffer_rows or max(Config.SINK_BUFFER_ROWS, HISTORY_BUFFER_ROWS))
+        self.history = RunHistory(path)
+        self.run_id = self.history.start_run(label)
+        self._entries = []
+
+    def _write_row(self, row, sheet_name):
+        self._entries.append((sheet_name, row))
+
+    def flush(self):
+        super().flush()
+        if self._entries:
+            self.history.add_results(self.run_id, self._entries)
+            self._entries.clear()
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            super().close()
+            self.history.finish_run(self.run_id)
+        finally:
+            self.history.close()
+        print(f"Run {self.run_id} recorded in history: {self.history.path}")
+
+
+def diff_runs(old='previous', new='latest', report=None, output=None, limit=20, path=None):
+    """
+    Print which failures are new, resolved and persistent between two runs.
+
+    :param old: Reference of the earlier run, see RunHistory.resolve_run
+    :param new: Reference of the later run
+    :param report: Only compare this report sheet or test name
+    :param output: CSV file to write every differing and persistent failure to
+    :param limit: New and resolved failures printed per status
+    :param path: History file; Config.HISTORY_PATH if not given
+    :return: Dictionary mapping each of DIFF_STATUSES to {report: count}
+    :raises ValueError: If the history or a run does not exist
+    """
+    path = path or Config.HISTORY_PATH
+    if not os.path.exists(path):
+        raise ValueError(f"No run history at {path}; runs are recorded while HISTORY_ENABLED is True")
+    if report:
+        from tests.registry import TESTS
+        if report in TESTS:
+            report = TESTS[report].report_name
+
+    with RunHistory(path) as history:
+        run_a, run_b = history.resolve_run(old), history.resolve_run(new)
+        counts = history.diff_counts(run_a, run_b, report)
+
+        print(f"Failures from run {run_a} to run {run_b}:")
+        reports = sorted({name for by_report in counts.values() for name in by_report})
+        print(f"  {'Report':<32}" + ''.join(f"{status:>15}" for status in DIFF_STATUSES))
+        for name in reports:
+            print(f"  {name:<32}" + ''.join(f"{counts[status].get(name, 0):>15}" for status in DIFF_STATUSES))
+        if not reports:
+            print("  No failures in either run.")
+
+        for status in ('new', 'resolved'):
+            total = sum(counts[status].values())
+            if not total:
+                continue
+            print(f"\n{status.capitalize()} failures ({total}):")
+            for shown, item in enumerate(history.iter_diff(run_a, run_b, status, report)):
+                if shown >= limit:
+                    print(f"  ... {total - limit} more")
+                    break
+                print(f"  [{item['report']}] {item['page_url']} | {item['testcase']} | {item['detail'] or item['comments']}")
+
+        if output:
+            if os.path.dirname(output):
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+            with open(output, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['status', 'report', 'page_url', 'testcase', 'detail', 'comments'])
+                writer.writeheader()
+                for status in DIFF_STATUSES:
+                    for item in history.iter_diff(run_a, run_b, status, report):
+                        writer.writerow({'status': status, **item})
+            print(f"\nDiff written: {output}")
+    return counts
+
+
+def list_runs(limit=20, path=None):
+    """
+    Print the most recent runs of the history.
+
+    :param limit: Runs printed
+    :param path: History file; Config.HISTORY_PATH if not given
+    """
+    path = path or Config.HISTORY_PATH
+    if not os.path.exists(path):
+        print(f"No run history at {path}.")
+        return
+    with RunHistory(path) as history:
+        for run in history.runs(limit):
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started_at']))
+            state = f"{run['rows']:>9} rows {run['failures']:>8} failed" if run['finished_at'] else "  unfinished"
+            print(f"{run['run_id']:>6}  {started}  {state}  {run['label'] or ''}")
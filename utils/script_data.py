@@ -0,0 +1,279 @@
+import json
+import re
+
+# Where ScriptData and ScriptData.pageData are assigned, wherever the script sits in the page
+SCRIPT_DATA_PATTERN = re.compile(r'\bScriptData\s*=(?!=)\s*\{')
+PAGE_DATA_PATTERN = re.compile(r'\bScriptData\.pageData\s*=(?!=)\s*\{')
+
+# Strings, comments and braces, to find the end of an object literal
+_BRACE_SCAN = re.compile(r'''"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`|//[^\n]*|/\*.*?\*/|[{}]''',
+                         re.DOTALL)
+
+# Tokens of a JavaScript object literal, to rewrite it as JSON
+_JS_TOKEN = re.compile(r'''
+    (?P<dstring>"(?:[^"\\]|\\.)*")
+  | (?P<sstring>'(?:[^'\\]|\\.)*')
+  | (?P<tstring>`(?:[^`\\]|\\.)*`)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<based>-?0[xXoObB][\da-fA-F]+)
+  | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<space>\s+)
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+# A regular expression literal, only looked for where a value starts
+_REGEX_LITERAL = re.compile(r'(?P<regex>/(?![/*])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[a-z]*)')
+_STRING_ESCAPE = re.compile(r'''\\(.)|["\n\r\t]''', re.DOTALL)
+_JSON_IDENTIFIERS = {'true': 'true', 'false': 'false', 'null': 'null',
+                     'undefined': 'null', 'NaN': 'null', 'Infinity': 'null'}
+_VALUE_STARTS = (None, ':', ',', '[', '(')
+
+
+def _object_literal(text, start):
+    """
+    Return the balanced {...} that opens at text[start], or None if it never closes.
+    """
+    depth = 0
+    for match in _BRACE_SCAN.finditer(text, start):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:match.end()]
+    return None
+
+
+def _quoted_to_json(token):
+    def replace(match):
+        if match.group(1) is None:
+            return json.dumps(match.group())[1:-1]
+        # JSON has no \' or \` escapes
+        return match.group(1) if match.group(1) in "'`" else match.group()
+    return '"' + _STRING_ESCAPE.sub(replace, token[1:-1]) + '"'
+
+
+def _tokens(literal):
+    """
+    Significant tokens of a literal as (kind, text) pairs, without spaces and comments.
+    """
+    tokens = []
+    position = 0
+    while position < len(literal):
+        match = None
+        previous = tokens[-1][1] if tokens else None
+        if literal.startswith('/', position) and previous in _VALUE_STARTS:
+            match = _REGEX_LITERAL.match(literal, position)
+        match = match or _JS_TOKEN.match(literal, position)
+        position = match.end()
+        if match.lastgroup not in ('comment', 'space'):
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+def _json_scalar(kind, token):
+    """
+    JSON text of a single value token, or None if JSON cannot express it.
+    """
+    try:
+        if kind in ('dstring', 'sstring') or (kind == 'tstring' and '${' not in token):
+            text = _quoted_to_json(token)
+        elif kind == 'based':
+            text = json.dumps(int(token, 0))
+        elif kind == 'number':
+            # JavaScript allows forms JSON does not, such as .5 or 007
+            text = json.dumps(int(token) if token.lstrip('-').isdigit() else float(token))
+        elif kind == 'ident':
+            text = _JSON_IDENTIFIERS.get(token, json.dumps(token))
+        else:
+            return None
+        json.loads(text)
+    except ValueError:
+        return None
+    return text
+
+
+def _value_end(tokens, index):
+    # Index of the comma or closing bracket that ends the value starting at index
+    depth = 0
+    for end in range(index, len(tokens)):
+        kind, token = tokens[end]
+        if kind != 'other':
+            continue
+        if token in '([{':
+            depth += 1
+        elif token in ')]}':
+            if depth == 0:
+                return end
+            depth -= 1
+        elif token == ',' and depth == 0:
+            return end
+    return len(tokens)
+
+
+def _convert_value(tokens, index):
+    """
+    Convert the value starting at tokens[index].
+
+    :return: JSON text and the index after the value
+    """
+    kind, token = tokens[index]
+    if kind == 'other' and token in '{[':
+        text, after = _convert_container(tokens, index)
+    else:
+        text, after = _json_scalar(kind, token), index + 1
+    end = _value_end(tokens, index)
+    if after != end:
+        # An expression, such as a function call, new Date() or a property access
+        return 'null', end
+    return text or 'null', end
+
+
+def _convert_container(tokens, index):
+    closing = '}' if tokens[index][1] == '{' else ']'
+    items = []
+    index += 1
+    while index < len(tokens) and tokens[index] != ('other', closing):
+        if tokens[index] == ('other', ','):
+            index += 1
+            continue
+        if closing == ']':
+            value, index = _convert_value(tokens, index)
+            items.append(value)
+            continue
+        kind, key = tokens[index]
+        if kind in ('dstring', 'sstring', 'tstring'):
+            key = _json_scalar(kind, key)
+        elif kind in ('ident', 'number', 'based'):
+            key = json.dumps(key)
+        else:
+            key = None
+        if key is None or index + 1 >= len(tokens) or tokens[index + 1] != ('other', ':'):
+            # Shorthand properties, spreads and methods have no value JSON can hold
+            index = _value_end(tokens, index)
+            continue
+        value, index = _convert_value(tokens, index + 2)
+        items.append(f"{key}:{value}")
+    if index >= len(tokens):
+        raise ValueError(f"Unclosed {'object' if closing == '}' else 'array'} literal")
+    opening = '{' if closing == '}' else '['
+    return opening + ','.join(items) + closing, index + 1
+
+
+def js_literal_to_json(literal):
+    """
+    Rewrite a JavaScript object literal as JSON: unquoted keys, single-quoted and template
+    strings, hex numbers, comments, trailing commas and undefined are converted. Values
+    JSON cannot hold, such as regular expressions or function calls, become null, so one
+    of them does not cost the rest of the object.
+
+    :param literal: Object literal source, e.g. '{CampaignId: "A1", Tags: ['x',],}'
+    :return: JSON text
+    :raises ValueError: If the literal is not a complete object or array
+    """
+    tokens = _tokens(literal)
+    if not tokens:
+        raise ValueError("Empty literal")
+    text, end = _convert_value(tokens, 0)
+    if end != len(tokens):
+        raise ValueError("Unexpected text after the literal")
+    return text
+
+
+def parse_object_literal(literal):
+    """
+    Parse an object literal as JSON, or as a JavaScript object literal if it is not valid JSON.
+
+    :return: Dictionary, or None if the literal cannot be parsed
+    """
+    try:
+        return json.loads(literal)
+    except ValueError:
+        pass
+    try:
+        return json.loads(js_literal_to_json(literal))
+    except ValueError:
+        return None
+
+
+def find_assignment(scripts, pattern):
+    """
+    Find the first object assigned by pattern across inline scripts and parse it.
+
+    :param scripts: Inline script bodies
+    :param pattern: Compiled pattern ending at the opening brace of the object
+    :return: Dictionary, or None if no parsable assignment was found
+    """
+    for script in scripts:
+        if 'ScriptData' not in script:
+            continue
+        for match in pattern.finditer(script):
+            literal = _object_literal(script, match.end() - 1)
+            value = parse_object_literal(literal) if literal else None
+            if isinstance(value, dict):
+                return value
+    return None
+
+
+def extract_script_data(scripts):
+    """
+    Extract the full ScriptData object of a page, with ScriptData.pageData merged in
+    under 'pageData' when it is assigned separately.
+
+    :param scripts: Inline script bodies, e.g. PageSnapshot.scripts
+    :return: Dictionary, or None if the page assigns neither
+    """
+    script_data = find_assignment(scripts, SCRIPT_DATA_PATTERN)
+    page_data = find_assignment(scripts, PAGE_DATA_PATTERN)
+    if script_data is None and page_data is None:
+        return None
+    script_data = script_data or {}
+    if page_data is not None:
+        script_data['pageData'] = {**script_data.get('pageData', {}), **page_data}
+    return script_data
+
+
+def _follow(data, keys):
+    for key in keys:
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+def lookup(data, path):
+    """
+    Value at a dotted key path, e.g. 'userInfo.IP'. If the path does not start at the
+    top level, the first nested object where it matches is used.
+
+    :return: The value, or None if the path is not found
+    """
+    keys = path.split('.')
+    pending = [data]
+    while pending:
+        current = pending.pop(0)
+        value = _follow(current, keys)
+        if value is not None:
+            return value
+        if isinstance(current, dict):
+            pending.extend(value for value in current.values() if isinstance(value, dict))
+    return None
+
+
+def export_fields(script_data, fields):
+    """
+    Pick report columns out of a ScriptData object.
+
+    :param script_data: Dictionary returned by extract_script_data
+    :param fields: Dictionary mapping column name to key path, e.g. Config.SCRIPT_DATA_FIELDS
+    :return: Dictionary mapping column name to value; nested values are stored as JSON text
+    """
+    row = {}
+    for column, path in fields.items():
+        value = lookup(script_data, path)
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        if value is not None:
+            row[column] = value
+    return row
@@ -0,0 +1,98 @@
+import hashlib
+import os
+from collections import Counter
+from config.config import Config
+from utils.excel_reporter import ReportSession
+from utils.link_cache import normalize_url
+from utils.result_sinks import iter_sqlite_results, read_sqlite_metadata
+
+
+def parse_shard(spec):
+    """
+    Parse a shard argument such as '2/8'.
+
+    :param spec: 'i/N' with 1 <= i <= N
+    :return: Tuple (i, N)
+    :raises ValueError: If the argument is malformed
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, e.g. 1/4, got '{spec}'")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def shard_of(url, count):
+    """
+    Shard a URL belongs to. The same URL always lands in the same shard on every
+    machine, without any coordination.
+
+    :param url: Page URL
+    :param count: Number of shards
+    :return: Shard index between 1 and count
+    """
+    digest = hashlib.sha1(normalize_url(url).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def select_shard(urls, index, count):
+    """
+    Keep the URLs of one shard, in input order.
+    """
+    return [url for url in urls if shard_of(url, count) == index]
+
+
+def shard_filename(index, count):
+    """
+    Report path of one shard; its SQLite store is written next to it with the same name.
+    """
+    return os.path.join(Config.REPORT_DIRECTORY, f"shard_{index}_of_{count}.xlsx")
+
+
+def merge_shards(paths, filename=None, formats=None):
+    """
+    Combine shard stores into one report. When a page was tested by more than one
+    shard, e.g. after a re-run, the results of the most recent store are kept.
+
+    :param paths: SQLite stores written by sharded runs
+    :param filename: Path of the merged workbook; REPORT_DIRECTORY/REPORT_FILENAME if not given
+    :param formats: Output formats; Config.OUTPUT_FORMATS if not given
+    :return: Dictionary with the merge summary
+    :raises ValueError: If a path is missing or not a shard store; nothing is written then
+    """
+    paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+    metadata = {path: read_sqlite_metadata(path) for path in paths}
+    paths = sorted(paths, key=lambda path: float(metadata[path].get('created_at', 0)), reverse=True)
+    shards = sorted({metadata[path]['shard'] for path in paths if 'shard' in metadata[path]},
+                    key=lambda shard: tuple(int(part) for part in shard.split('/')))
+
+    # First pass: the newest store that has results of a page owns them
+    owners = {}
+    for index, path in enumerate(paths):
+        for sheet_name, row in iter_sqlite_results(path):
+            owners.setdefault((sheet_name, row.get('page_url')), index)
+
+    # Second pass: stream the owned rows into the merged report
+    summary = {'stores': len(paths), 'rows': 0, 'duplicate_rows': 0, 'failed': Counter()}
+    pages = set()
+    label = f"merge of shard(s) {', '.join(shards)}" if shards else f"merge of {len(paths)} store(s)"
+    with ReportSession(filename, formats, history=True, history_label=label) as report:
+        for index, path in enumerate(paths):
+            for sheet_name, row in iter_sqlite_results(path):
+                if owners[(sheet_name, row.get('page_url'))] != index:
+                    summary['duplicate_rows'] += 1
+                    continue
+                report.add([row], sheet_name)
+                pages.add(row.get('page_url'))
+                summary['rows'] += 1
+                if row.get('passed') is False:
+                    summary['failed'][sheet_name] += 1
+    summary['pages'] = len(pages)
+
+    print(f"Merged {summary['stores']} shard store(s): {summary['pages']} page(s), {summary['rows']} row(s), "
+          f"{summary['duplicate_rows']} duplicate row(s) dropped.")
+    for sheet_name, failed in sorted(summary['failed'].items()):
+        print(f"  {sheet_name}: {failed} failed")
+    return summary
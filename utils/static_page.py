@@ -0,0 +1,122 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from config.config import Config
+from utils.deadline import current_deadline
+from utils.page_snapshot import PageSnapshot
+from utils.profiler import PROFILER
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional, html.parser is used without it
+    lxml = None
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+class _SnapshotParser(HTMLParser):
+    """
+    Collects headings, images, links and inline scripts with the standard library parser.
+    """
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.headings = []
+        self.images = []
+        self.links = []
+        self.scripts = []
+        self._script = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'base' and attrs.get('href'):
+            self.base_url = urljoin(self.base_url, attrs['href'])
+        elif tag in HEADING_TAGS:
+            self.headings.append(tag)
+        elif tag == 'img':
+            self.images.append({'src': _resolve(self.base_url, attrs.get('src')), 'alt': attrs.get('alt')})
+        elif tag == 'a':
+            self.links.append(_resolve(self.base_url, attrs.get('href')))
+        elif tag == 'script' and 'src' not in attrs:
+            self._script = []
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._script is not None:
+            self.scripts.append(''.join(self._script))
+            self._script = None
+
+
+def _resolve(base_url, value):
+    # Mirror the browser, which reports src/href resolved against the page URL
+    if value is None:
+        return None
+    return urljoin(base_url, value.strip())
+
+
+def _parse_with_lxml(url, html):
+    document = lxml.html.fromstring(html, base_url=url)
+    base_href = document.xpath('string(//base/@href)')
+    base_url = urljoin(url, base_href) if base_href else url
+    return PageSnapshot(
+        url=url,
+        html=html,
+        headings=[element.tag for element in document.iter(*HEADING_TAGS)],
+        images=[{'src': _resolve(base_url, image.get('src')), 'alt': image.get('alt')}
+                for image in document.iter('img')],
+        links=[_resolve(base_url, link.get('href')) for link in document.iter('a')],
+        scripts=[script.text or '' for script in document.iter('script') if script.get('src') is None],
+    )
+
+
+def parse_static_snapshot(url, html):
+    """
+    Build a PageSnapshot from raw HTML without executing JavaScript.
+    Uses lxml when it is installed and html.parser otherwise.
+
+    :param url: URL the HTML was fetched from
+    :param html: Page HTML
+    :return: PageSnapshot
+    """
+    if lxml is not None and html.strip():
+        return _parse_with_lxml(url, html)
+
+    parser = _SnapshotParser(url)
+    parser.feed(html)
+    parser.close()
+    return PageSnapshot(
+        url=url,
+        html=html,
+        headings=parser.headings,
+        images=parser.images,
+        links=parser.links,
+        scripts=parser.scripts,
+    )
+
+
+def fetch_static_snapshot(url, session=None):
+    """
+    Fetch a page over HTTP and capture it for the read-only checks, without a browser.
+
+    :param url: URL of the page to fetch
+    :param session: requests.Session to reuse connections; a one-off request is made if not given
+    :return: PageSnapshot
+    :raises DeadlineExceeded: If the page was not fetched within the current deadline
+    """
+    import requests
+
+    deadline = current_deadline()
+    with PROFILER.phase('fetch_page'):
+        try:
+            response = (session or requests).get(url, timeout=deadline.timeout(Config.PAGE_FETCH_TIMEOUT),
+                                                 headers={'User-Agent': Config.STATIC_USER_AGENT})
+        except requests.Timeout:
+            if deadline.expired:
+                deadline.check()
+            raise
+        response.raise_for_status()
+    with PROFILER.phase('parse_page'):
+        return parse_static_snapshot(response.url, response.text)
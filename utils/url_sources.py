@@ -0,0 +1,145 @@
+import gzip
+import xml.etree.ElementTree as ET
+from collections import deque
+from urllib.parse import urldefrag, urlsplit
+from config.config import Config
+from utils.static_page import fetch_static_snapshot
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+def load_urls_from_file(path):
+    """
+    Read page URLs from a text file, one per line. Blank lines and lines starting with '#' are skipped.
+
+    :param path: Path of the URL file
+    :return: List of URLs
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith('#')]
+
+
+def load_urls_from_sitemap(sitemap_url, max_pages=None, session=None):
+    """
+    Read page URLs from a sitemap.xml, following sitemap index files.
+
+    :param sitemap_url: URL of the sitemap or sitemap index
+    :param max_pages: Stop after this many page URLs
+    :param session: requests.Session to reuse connections
+    :return: List of URLs
+    """
+    import requests
+
+    session = session or requests.Session()
+    max_pages = max_pages or Config.MAX_PAGES
+    urls = []
+    pending = deque([sitemap_url])
+    seen_sitemaps = set()
+
+    while pending and len(urls) < max_pages:
+        current = pending.popleft()
+        if current in seen_sitemaps:
+            continue
+        seen_sitemaps.add(current)
+
+        response = session.get(current, timeout=Config.PAGE_FETCH_TIMEOUT)
+        response.raise_for_status()
+        content = response.content
+        if content[:2] == b'\x1f\x8b':  # Served as a .gz file rather than gzip-encoded
+            content = gzip.decompress(content)
+
+        root = ET.fromstring(content)
+        locations = [loc.text.strip() for loc in root.iter(f'{SITEMAP_NS}loc') if loc.text]
+        if root.tag == f'{SITEMAP_NS}sitemapindex':
+            pending.extend(locations)
+        else:
+            urls.extend(locations[:max_pages - len(urls)])
+
+    return urls
+
+
+def crawl_same_site(seed_url, depth, max_pages=None):
+    """
+    Discover pages by following same-site links from a seed page, breadth first.
+    Pages are fetched as static HTML, so discovery does not need a browser.
+
+    :param seed_url: URL to start from
+    :param depth: How many links away from the seed to follow (0 = seed only)
+    :param max_pages: Stop after this many pages
+    :return: List of URLs, seed first
+    """
+    import requests
+
+    max_pages = max_pages or Config.MAX_PAGES
+    host = urlsplit(seed_url).netloc.lower()
+    seen = {seed_url}
+    urls = [seed_url]
+    frontier = deque([(seed_url, 0)])
+
+    with requests.Session() as session:
+        while frontier and len(urls) < max_pages:
+            url, level = frontier.popleft()
+            if level >= depth:
+                continue
+            try:
+                snapshot = fetch_static_snapshot(url, session)
+            except requests.RequestException as e:
+                print(f"Skipping links of {url}: {e}")
+                continue
+
+            for href in snapshot.links:
+                if not href or not href.startswith('http'):
+                    continue
+                href = urldefrag(href)[0]
+                if urlsplit(href).netloc.lower() != host or href in seen:
+                    continue
+                seen.add(href)
+                urls.append(href)
+                frontier.append((href, level + 1))
+                if len(urls) >= max_pages:
+                    break
+
+    return urls
+
+
+def describe_source():
+    """
+    Short description of where collect_urls takes the pages from, e.g. to label a run.
+    """
+    if Config.URLS:
+        return f"{len(Config.URLS)} URL(s)"
+    if Config.URLS_FILE:
+        return f"file {Config.URLS_FILE}"
+    if Config.ENGINE == 'replay':
+        return f"archive {Config.REPLAY_ARCHIVE}"
+    if Config.SITEMAP_URL:
+        return f"sitemap {Config.SITEMAP_URL}"
+    if Config.CRAWL_DEPTH > 0:
+        return f"crawl {Config.TEST_SITE_URL} depth {Config.CRAWL_DEPTH}"
+    return Config.TEST_SITE_URL
+
+
+def collect_urls():
+    """
+    Build the list of pages to test from the configured source: URLS, then URLS_FILE,
+    then the pages of REPLAY_ARCHIVE when replaying, then SITEMAP_URL, then a crawl
+    from TEST_SITE_URL up to CRAWL_DEPTH.
+
+    :return: List of unique URLs in input order
+    """
+    if Config.URLS:
+        urls = list(Config.URLS)
+    elif Config.URLS_FILE:
+        urls = load_urls_from_file(Config.URLS_FILE)
+    elif Config.ENGINE == 'replay':
+        from utils.page_archive import PageArchive
+        with PageArchive(Config.REPLAY_ARCHIVE) as archive:
+            urls = archive.urls()
+    elif Config.SITEMAP_URL:
+        urls = load_urls_from_sitemap(Config.SITEMAP_URL)
+    elif Config.CRAWL_DEPTH > 0:
+        urls = crawl_same_site(Config.TEST_SITE_URL, Config.CRAWL_DEPTH)
+    else:
+        urls = [Config.TEST_SITE_URL]
+    return list(dict.fromkeys(urls))[:Config.MAX_PAGES]
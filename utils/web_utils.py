@@ -1,35 +1,177 @@
 # utils/web_utils.py
-import requests
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from config.config import Config
+from utils.deadline import DeadlineExceeded, current_deadline
+from utils.link_checker import LinkChecker
 
-def check_url_status(url):
+# Resolves as soon as check() reports ready, re-checking on every DOM mutation
+# instead of polling. check() returns {ready: bool, value: any}.
+OBSERVE_UNTIL_JS = """
+var args = arguments;
+var done = args[args.length - 1];
+var timeoutMs = args[0];
+var check = function () { %s };
+var state = check();
+if (state.ready) { done({ready: true, value: state.value}); return; }
+var timer = null;
+var observer = new MutationObserver(function () {
+    state = check();
+    if (state.ready) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done({ready: true, value: state.value});
+    }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true, attributes: true});
+timer = setTimeout(function () {
+    observer.disconnect();
+    done({ready: false, value: check().value});
+}, timeoutMs);
+"""
+
+ALL_TEXT_CHECK_JS = """
+var elements = document.querySelectorAll(args[1]);
+var texts = Array.prototype.map.call(elements, function (el) { return el.innerText; });
+return {
+    ready: texts.length > 0 && texts.every(function (text) { return text.indexOf(args[2]) !== -1; }),
+    value: texts
+};
+"""
+
+VISIBLE_CHECK_JS = """
+var el = document.querySelector(args[1]);
+var visible = !!el && el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+return {ready: visible, value: visible};
+"""
+
+# Resolves once no new resource has started loading for idleMs
+NETWORK_IDLE_JS = """
+var done = arguments[arguments.length - 1];
+var idleMs = arguments[0], timeoutMs = arguments[1];
+var started = Date.now();
+var lastActivity = started;
+var observer = new PerformanceObserver(function () { lastActivity = Date.now(); });
+observer.observe({entryTypes: ['resource']});
+var timer = setInterval(function () {
+    var now = Date.now();
+    var idle = now - lastActivity >= idleMs && document.readyState === 'complete';
+    if (idle || now - started >= timeoutMs) {
+        clearInterval(timer);
+        observer.disconnect();
+        done(idle);
+    }
+}, 50);
+"""
+
+def check_url_status(url, checker=None):
     """
     Check URL status code
     
     :param url: URL to check
-    :return: HTTP status code
+    :param checker: LinkChecker whose pooled connections are reused; a one-off checker is used if not given
+    :return: HTTP status code, or None if no response was received
+    """
+    if checker is not None:
+        return checker.check(url).status_code
+    with LinkChecker(max_workers=1, per_host_limit=1) as checker:
+        return checker.check(url).status_code
+
+def wait_timeout(timeout=None):
+    """
+    Timeout of one wait: the time left on the current deadline, at most Config.WAIT_TIMEOUT.
+
+    :param timeout: Explicit timeout, used as is
+    :raises DeadlineExceeded: If the current deadline has passed
     """
+    if timeout is not None:
+        return timeout
+    return current_deadline().timeout(Config.WAIT_TIMEOUT)
+
+def load_page(driver, url):
+    """
+    Navigate to a page within the time left on the current deadline, at most Config.PAGE_LOAD_TIMEOUT.
+
+    :param driver: Selenium WebDriver
+    :param url: URL to load
+    :raises DeadlineExceeded: If the deadline has passed or the page did not load in time
+    """
+    timeout = max(1, int(current_deadline().timeout(Config.PAGE_LOAD_TIMEOUT) + 0.5))
+    # Only pay the extra WebDriver round-trip when the timeout changes
+    if getattr(driver, 'deadline_page_load_timeout', None) != timeout:
+        driver.set_page_load_timeout(timeout)
+        driver.deadline_page_load_timeout = timeout
     try:
-        response = requests.head(url, timeout=10)
-        return response.status_code
-    except requests.RequestException:
-        return 404
+        driver.get(url)
+    except TimeoutException:
+        raise DeadlineExceeded(f"page load did not finish within {timeout}s: {url}")
 
-def wait_for_element(driver, selector, timeout=10):
+def wait_for_element(driver, selector, timeout=None):
     """
     Wait for an element to be present
     
     :param driver: Selenium WebDriver
     :param selector: CSS selector
-    :param timeout: Maximum wait time
+    :param timeout: Maximum wait time; the time left on the current deadline, at most Config.WAIT_TIMEOUT, if not given
     :return: WebElement if found
     """
+    timeout = wait_timeout(timeout)
     try:
         element = WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, selector))
         )
         return element
     except:
-        return None
\ No newline at end of file
+        return None
+
+def _ensure_script_timeout(driver, timeout):
+    # The browser-side timeout must fire before WebDriver gives up on the script
+    required = timeout + 5
+    if getattr(driver, 'wait_script_timeout', 0) < required:
+        driver.set_script_timeout(required)
+        driver.wait_script_timeout = required
+
+def _run_async(driver, script, timeout, *args):
+    _ensure_script_timeout(driver, timeout)
+    return driver.execute_async_script(script, int(timeout * 1000), *args)
+
+def wait_for_all_text(driver, selector, text, timeout=None):
+    """
+    Wait until every element matching a selector contains a text, returning as soon
+    as a DOM mutation makes it true. The element texts come back in the same call.
+    
+    :param driver: Selenium WebDriver
+    :param selector: CSS selector
+    :param text: Text every matching element must contain
+    :param timeout: Maximum wait time; see wait_for_element
+    :return: Tuple (True if the condition held before the timeout, list of element texts)
+    """
+    result = _run_async(driver, OBSERVE_UNTIL_JS % ALL_TEXT_CHECK_JS, wait_timeout(timeout), selector, text)
+    return result['ready'], result['value']
+
+def wait_for_visible(driver, selector, timeout=None):
+    """
+    Wait until the first element matching a selector is displayed,
+    e.g. the options list of an opened dropdown.
+    
+    :param driver: Selenium WebDriver
+    :param selector: CSS selector
+    :param timeout: Maximum wait time; see wait_for_element
+    :return: True if the element became visible before the timeout
+    """
+    return _run_async(driver, OBSERVE_UNTIL_JS % VISIBLE_CHECK_JS, wait_timeout(timeout), selector)['ready']
+
+def wait_for_network_idle(driver, idle_time=0.5, timeout=None):
+    """
+    Wait until the page has loaded and no new resource has been requested for idle_time.
+    
+    :param driver: Selenium WebDriver
+    :param idle_time: Seconds without new requests that count as idle
+    :param timeout: Maximum wait time; see wait_for_element
+    :return: True if the network went idle before the timeout
+    """
+    timeout = wait_timeout(timeout)
+    _ensure_script_timeout(driver, timeout)
+    return driver.execute_async_script(NETWORK_IDLE_JS, int(idle_time * 1000), int(timeout * 1000))